@@ -1,8 +1,68 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
 from .models import Company, User
 
 
+# Opções do filtro de empresa na lateral do changelist; as demais pela busca
+FILTRO_MAX_EMPRESAS = 30
+
+# Abaixo disso o COUNT(*) é barato e a contagem exata é mantida
+ESTIMATIVA_MIN_LINHAS = 10000
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator do admin que, no changelist sem filtros, usa a estimativa do
+    PostgreSQL (pg_class.reltuples) no lugar do COUNT(*) da tabela inteira
+    """
+    
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql' and not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+                    [queryset.model._meta.db_table]
+                )
+                row = cursor.fetchone()
+            # reltuples é -1 (ou 0) em tabelas ainda não analisadas
+            if row and row[0] >= ESTIMATIVA_MIN_LINHAS:
+                return int(row[0])
+        return super().count
+
+
+class EmpresaListFilter(admin.RelatedFieldListFilter):
+    """Filtro de empresa com até FILTRO_MAX_EMPRESAS opções (mais a selecionada)"""
+    
+    def field_choices(self, field, request, model_admin):
+        empresas = Company.objects.order_by('name').values_list('pk', 'name')
+        choices = [(str(pk), name) for pk, name in empresas[:FILTRO_MAX_EMPRESAS]]
+        if self.lookup_val and self.lookup_val not in {pk for pk, _ in choices}:
+            try:
+                choices += [(str(pk), name) for pk, name in empresas.filter(pk=self.lookup_val)]
+            except ValidationError:
+                pass
+        return choices
+
+
+class EmpresaAdminMixin:
+    """
+    Changelists de dados por empresa: empresa no mesmo SELECT (os __str__ usam
+    company.name), autocomplete no formulário e sem o COUNT(*) da tabela
+    inteira ao lado do total filtrado
+    """
+    list_select_related = ['company']
+    autocomplete_fields = ['company']
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+
+
 @admin.register(Company)
 class CompanyAdmin(admin.ModelAdmin):
     list_display = ['name', 'slug', 'is_active', 'created_at']
@@ -13,10 +73,10 @@ class CompanyAdmin(admin.ModelAdmin):
 
 
 @admin.register(User)
-class UserAdmin(BaseUserAdmin):
+class UserAdmin(EmpresaAdminMixin, BaseUserAdmin):
     list_display = ['email', 'first_name', 'last_name', 'company', 'role', 'is_active']
-    list_filter = ['role', 'company', 'is_active', 'is_staff']
-    search_fields = ['email', 'first_name', 'last_name']
+    list_filter = ['role', ('company', EmpresaListFilter), 'is_active', 'is_staff']
+    search_fields = ['email', 'first_name', 'last_name', 'company__name']
     ordering = ['email']
     
     fieldsets = (
@@ -5,3 +5,13 @@ class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
     verbose_name = 'Core'
+    
+    def ready(self):
+        from django.conf import settings
+        from . import checks, signals  # noqa: F401
+        
+        if getattr(settings, 'REQUEST_METRICS_ENABLED', True):
+            from django.db.backends.signals import connection_created
+            from .middleware import install_query_metrics, install_serializer_timing
+            install_serializer_timing()
+            connection_created.connect(install_query_metrics, dispatch_uid='request_metrics_queries')
@@ -0,0 +1,144 @@
+"""
+Autenticação JWT sem estado.
+
+O token de acesso carrega `company_id`, `role` e `can_edit` (gravados no login
+e no refresh), então as requisições são autorizadas só com as claims, sem
+buscar o usuário no banco. Para revogar tokens já emitidos (usuário
+desativado, mudança de função, empresa ou senha) o usuário entra em uma lista
+de bloqueio no cache, válida pelo tempo de vida do token de acesso. O modo
+exige um cache compartilhado entre os processos (core/checks.py) e encurta o
+token de acesso (JWT_STATELESS_ACCESS_MINUTES).
+"""
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import Company, User
+
+
+# claims_iat: momento da emissão com fração de segundo (o iat do JWT é inteiro
+# e não distingue um token emitido logo após a revogação)
+TENANT_CLAIMS = ('company_id', 'role', 'can_edit', 'claims_iat')
+
+
+def get_deny_list_cache():
+    return caches[getattr(settings, 'JWT_DENY_LIST_CACHE_ALIAS', 'default')]
+
+
+def deny_list_key(user_id):
+    return f'jwt-deny:{user_id}'
+
+
+def add_tenant_claims(token, user):
+    """Grava empresa, função e permissão de edição no token"""
+    token['company_id'] = str(user.company_id) if user.company_id else None
+    token['role'] = user.role
+    token['can_edit'] = user.can_edit
+    token['claims_iat'] = time.time()
+    return token
+
+
+def revoke_user_tokens(*user_ids):
+    """Invalida todos os tokens dos usuários emitidos até agora"""
+    agora = time.time()
+    get_deny_list_cache().set_many(
+        {deny_list_key(user_id): agora for user_id in user_ids},
+        timeout=int(api_settings.ACCESS_TOKEN_LIFETIME.total_seconds())
+    )
+
+
+def is_token_revoked(user_id, issued_at):
+    revoked_at = get_deny_list_cache().get(deny_list_key(user_id))
+    return revoked_at is not None and issued_at < revoked_at
+
+
+class TenantTokenUser(TokenUser):
+    """Usuário montado a partir das claims do token (sem query)"""
+
+    is_active = True
+
+    @cached_property
+    def company_id(self):
+        company_id = self.token.get('company_id')
+        return uuid.UUID(company_id) if company_id else None
+
+    @cached_property
+    def role(self):
+        return self.token.get('role')
+
+    @property
+    def is_platform_admin(self):
+        return self.role == User.Role.PLATFORM_ADMIN
+
+    @property
+    def is_company_admin(self):
+        return self.role in [User.Role.PLATFORM_ADMIN, User.Role.COMPANY_ADMIN]
+
+    @cached_property
+    def can_edit(self):
+        return bool(self.token.get('can_edit'))
+
+    @cached_property
+    def company(self):
+        """Carregada sob demanda (só escritas precisam da instância)"""
+        if not self.company_id:
+            return None
+        return Company.objects.filter(pk=self.company_id).first()
+
+
+class TenantJWTAuthentication(JWTAuthentication):
+    """
+    Com JWT_STATELESS_AUTH ligado, autoriza pelas claims do token e consulta
+    apenas a lista de bloqueio no cache. Tokens emitidos antes das claims
+    existirem (ou com o modo desligado) seguem buscando o usuário no banco.
+    """
+
+    def authenticate(self, request):
+        # Token já validado pelo middleware (user_id_from_request)
+        validated_token = getattr(request._request, 'validated_jwt', None)
+        if validated_token is None:
+            return super().authenticate(request)
+        return self.get_user(validated_token), validated_token
+
+    def get_user(self, validated_token):
+        stateless = getattr(settings, 'JWT_STATELESS_AUTH', False)
+        if not stateless or any(claim not in validated_token for claim in TENANT_CLAIMS):
+            return super().get_user(validated_token)
+
+        user = TenantTokenUser(validated_token)
+        if is_token_revoked(user.id, validated_token['claims_iat']):
+            raise AuthenticationFailed('Token revogado.', code='token_revoked')
+        return user
+
+
+def user_id_from_request(request):
+    """
+    Id do usuário do token de acesso no header (None sem token válido). Usado
+    fora do DRF, antes da autenticação da view; não consulta a lista de bloqueio.
+    O token validado fica na requisição e a autenticação do DRF o reaproveita.
+    """
+    authentication = TenantJWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header else None
+    if raw_token is None:
+        return None
+    try:
+        token = authentication.get_validated_token(raw_token)
+    except InvalidToken:
+        return None
+    request.validated_jwt = token
+    return token.get(api_settings.USER_ID_CLAIM)
+
+
+def get_db_user(user):
+    """Instância real do usuário autenticado (para perfil e troca de senha)"""
+    if isinstance(user, User):
+        return user
+    return User.objects.select_related('company').get(pk=user.pk)
@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.checks import Error, register
+
+
+# Backends que guardam os dados em cada processo (ou no disco de cada host)
+CACHES_LOCAIS = ('LocMemCache', 'DummyCache', 'FileBasedCache')
+
+
+@register()
+def check_jwt_deny_list(app_configs, **kwargs):
+    """
+    Autenticação sem estado só com a lista de bloqueio em um cache
+    compartilhado: em um cache local a revogação vale só no processo que a
+    gravou e os demais workers seguem aceitando o token antigo
+    """
+    if not getattr(settings, 'JWT_STATELESS_AUTH', False):
+        return []
+
+    alias = getattr(settings, 'JWT_DENY_LIST_CACHE_ALIAS', 'default')
+    backend = settings.CACHES.get(alias, {}).get('BACKEND', '')
+    if backend.rsplit('.', 1)[-1] in CACHES_LOCAIS:
+        return [Error(
+            f'JWT_STATELESS_AUTH exige um cache compartilhado para a lista de bloqueio '
+            f'(o alias "{alias}" usa {backend}).',
+            hint='Configure CACHE_BACKEND/CACHE_LOCATION (ex.: Redis ou Memcached) '
+                 'ou desligue JWT_STATELESS_AUTH.',
+            id='core.E001',
+        )]
+    return []
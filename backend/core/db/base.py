@@ -0,0 +1,37 @@
+"""
+Backend PostgreSQL com pool de conexões (ENGINE 'core.db').
+
+Igual ao django.db.backends.postgresql, mas a conexão vem do pool do processo
+(core.db.pool) e, ao ser "fechada" pelo Django no fim da requisição, volta
+para ele. Configuração em DATABASES[alias]['POOL'].
+"""
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+
+from .pool import get_pool
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    @property
+    def pool(self):
+        return get_pool(self.alias, self.settings_dict)
+
+    def get_new_connection(self, conn_params):
+        connect = super().get_new_connection
+        connection = self.pool.checkout(lambda: connect(conn_params))
+        # Conexão reaproveitada: o connect do PostgreSQL não rodou para definir o nível
+        self.isolation_level = IsolationLevel(
+            self.settings_dict['OPTIONS'].get('isolation_level', IsolationLevel.READ_COMMITTED)
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is None:
+            return
+        with self.wrap_database_errors:
+            if self.in_atomic_block:
+                # Fechada no meio de um atomic(): o estado da transação é incerto
+                self.pool.discard(self.connection)
+            else:
+                self.pool.checkin(self.connection)
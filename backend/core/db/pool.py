@@ -0,0 +1,251 @@
+"""
+Pool de conexões PostgreSQL por processo.
+
+Sem pool, cada requisição abre uma conexão nova (TCP + autenticação) e a
+fecha no fim. Com o backend `core.db`, o "fechamento" do Django devolve a
+conexão ao pool e a próxima requisição (ou thread, ou comando de management)
+a reaproveita.
+
+- MAX_SIZE: máximo de conexões abertas (em uso + ociosas) no processo. Sem
+  conexão livre, o checkout espera até TIMEOUT segundos.
+- CHECK: ao retirar uma conexão ociosa do pool, confirma com SELECT 1 que ela
+  ainda responde; conexões quebradas são descartadas e substituídas.
+- MAX_IDLE / MAX_LIFETIME: conexões ociosas há mais de MAX_IDLE segundos ou
+  abertas há mais de MAX_LIFETIME são fechadas.
+
+Os contadores (checkouts, esperas, tempo de espera, conexões quebradas...)
+são expostos em GET /api/metrics/.
+"""
+import os
+import threading
+import time
+from collections import deque
+
+from psycopg2 import OperationalError
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_UNKNOWN
+
+
+POOL_DEFAULTS = {
+    'MAX_SIZE': 10,
+    'TIMEOUT': 10.0,
+    'MAX_IDLE': 300.0,
+    'MAX_LIFETIME': 3600.0,
+    'CHECK': True,
+}
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class PoolTimeout(OperationalError):
+    """Nenhuma conexão livre dentro do TIMEOUT (vira OperationalError no Django)"""
+
+
+class ConnectionPool:
+    """Pool thread-safe de conexões psycopg2"""
+
+    def __init__(self, max_size=10, timeout=10.0, max_idle=300.0, max_lifetime=3600.0, check=True):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.check = check
+
+        self._cond = threading.Condition()
+        # (conexão, aberta_em, devolvida_em); a mais recente no fim (LIFO)
+        self._idle = deque()
+        self._opened_at = {}
+        self._size = 0
+        self.stats = {
+            'checkouts': 0,
+            'created': 0,
+            'waits': 0,
+            'wait_time': 0.0,
+            'timeouts': 0,
+            'broken': 0,
+            'expired': 0,
+        }
+
+    def checkout(self, connect):
+        """Conexão ociosa saudável ou nova (`connect()`), esperando vaga se preciso"""
+        started = time.perf_counter()
+        waited = False
+
+        while True:
+            with self._cond:
+                conn, esperou = self._reserve(started)
+            waited = waited or esperou
+            if conn is None or self._healthy(conn):
+                break
+            self._stat('broken')
+            self._discard(conn)
+
+        if conn is None:
+            try:
+                conn = connect()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._opened_at[id(conn)] = time.monotonic()
+                self.stats['created'] += 1
+
+        with self._cond:
+            self.stats['checkouts'] += 1
+            if waited:
+                self.stats['waits'] += 1
+                self.stats['wait_time'] += time.perf_counter() - started
+        return conn
+
+    def _reserve(self, started):
+        """
+        Com o lock: retira uma ociosa ou reserva a vaga de uma nova (conexão
+        None). Retorna (conexão, esperou).
+        """
+        esperou = False
+        while True:
+            self._expire()
+            if self._idle:
+                return self._idle.pop()[0], esperou
+            if self._size < self.max_size:
+                self._size += 1
+                return None, esperou
+
+            restante = self.timeout - (time.perf_counter() - started)
+            if restante <= 0:
+                self.stats['timeouts'] += 1
+                raise PoolTimeout(
+                    f'Nenhuma conexão livre no pool em {self.timeout:g}s (MAX_SIZE={self.max_size}).'
+                )
+            esperou = True
+            self._cond.wait(restante)
+
+    def checkin(self, conn):
+        """Devolve a conexão ao pool (ou a descarta se estiver quebrada ou velha)"""
+        try:
+            status = conn.info.transaction_status if not conn.closed else TRANSACTION_STATUS_UNKNOWN
+            if status == TRANSACTION_STATUS_UNKNOWN:
+                raise OperationalError('conexão fechada')
+            if status != TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+        except Exception:
+            self._stat('broken')
+            self._discard(conn)
+            return
+
+        opened_at = self._opened_at.get(id(conn), 0)
+        if time.monotonic() - opened_at > self.max_lifetime:
+            self._stat('expired')
+            self._discard(conn)
+            return
+
+        with self._cond:
+            self._idle.append((conn, opened_at, time.monotonic()))
+            self._cond.notify()
+
+    def discard(self, conn):
+        """Fecha uma conexão em uso e libera a vaga"""
+        self._discard(conn)
+
+    def close_idle(self):
+        """Fecha todas as conexões ociosas (ex.: antes de um fork)"""
+        with self._cond:
+            ociosas = [conn for conn, _, _ in self._idle]
+            self._idle.clear()
+        for conn in ociosas:
+            self._discard(conn)
+
+    def snapshot(self):
+        with self._cond:
+            idle = len(self._idle)
+            return {
+                'max_size': self.max_size,
+                'size': self._size,
+                'in_use': self._size - idle,
+                'idle': idle,
+                **self.stats,
+                'wait_time': round(self.stats['wait_time'], 4),
+            }
+
+    def _healthy(self, conn):
+        if conn.closed:
+            return False
+        if not self.check:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            return True
+        except Exception:
+            return False
+
+    def _expire(self):
+        """Com o lock: fecha as ociosas além de MAX_IDLE (as mais antigas ficam no início)"""
+        agora = time.monotonic()
+        while self._idle and (
+            agora - self._idle[0][2] > self.max_idle
+            or agora - self._idle[0][1] > self.max_lifetime
+        ):
+            conn = self._idle.popleft()[0]
+            self.stats['expired'] += 1
+            self._size -= 1
+            self._opened_at.pop(id(conn), None)
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._size -= 1
+            self._opened_at.pop(id(conn), None)
+            self._cond.notify()
+
+    def _stat(self, nome):
+        with self._cond:
+            self.stats[nome] += 1
+
+
+def get_pool(alias, settings_dict):
+    """Pool do alias no processo atual (criado no primeiro uso)"""
+    pool = _pools.get(alias)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(alias)
+            if pool is None:
+                config = {**POOL_DEFAULTS, **settings_dict.get('POOL', {})}
+                pool = _pools[alias] = ConnectionPool(
+                    max_size=config['MAX_SIZE'],
+                    timeout=config['TIMEOUT'],
+                    max_idle=config['MAX_IDLE'],
+                    max_lifetime=config['MAX_LIFETIME'],
+                    check=config['CHECK'],
+                )
+    return pool
+
+
+def pool_stats():
+    """Estado e contadores dos pools do processo: {alias: {...}}"""
+    return {alias: pool.snapshot() for alias, pool in _pools.items()}
+
+
+def close_idle_connections():
+    for pool in list(_pools.values()):
+        pool.close_idle()
+
+
+def _reset_after_fork():
+    global _pools_lock
+    _pools_lock = threading.Lock()
+    _pools.clear()
+
+
+# Um processo filho (fork) não pode usar os sockets do pai: as ociosas são
+# fechadas antes do fork e o filho começa com pools vazios
+os.register_at_fork(before=close_idle_connections, after_in_child=_reset_after_fork)
@@ -0,0 +1,79 @@
+"""
+Leituras em réplicas do PostgreSQL.
+
+As réplicas são os aliases de settings.DATABASE_REPLICAS. Por padrão tudo
+lê e escreve no primário ('default'); dentro de `ler_da_replica()` (aberto
+pelo ReplicaRoutingMiddleware nos GET da API e por tarefas de relatório) as
+leituras vão para uma réplica sorteada, a mesma até o fim do bloco. Escritas
+e leituras dentro de uma transação do primário continuam nele.
+
+Depois de uma escrita o cliente lê do primário por DB_STICKY_PRIMARY_SECONDS
+(`marcar_escrita`), para sempre ver as próprias alterações mesmo com atraso
+de replicação. A marca é um cookie de vida curta na resposta da escrita: vale
+em qualquer worker que atender a próxima requisição.
+"""
+import contextvars
+import random
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+# Réplica das leituras do bloco atual (None: primário)
+_replica = contextvars.ContextVar('v4vision_db_replica', default=None)
+
+
+def replicas():
+    return list(getattr(settings, 'DATABASE_REPLICAS', []))
+
+
+@contextmanager
+def ler_da_replica(ativo=True):
+    """Leituras do bloco em uma réplica (no primário se não houver réplica)"""
+    aliases = replicas()
+    token = _replica.set(random.choice(aliases) if ativo and aliases else None)
+    try:
+        yield
+    finally:
+        _replica.reset(token)
+
+
+# Cookie que mantém as leituras do cliente no primário logo após uma escrita
+STICKY_COOKIE = 'v4vision_primario'
+
+
+def marcar_escrita(response, secure=False):
+    """O cliente acabou de escrever: lê do primário pela janela configurada"""
+    segundos = getattr(settings, 'DB_STICKY_PRIMARY_SECONDS', 10)
+    if segundos > 0:
+        response.set_cookie(
+            STICKY_COOKIE, '1', max_age=segundos, secure=secure, httponly=True, samesite='Lax'
+        )
+
+
+def escreveu_recentemente(request):
+    return STICKY_COOKIE in request.COOKIES
+
+
+class ReplicaRouter:
+    """Leituras na réplica do bloco atual; escritas e migrações no primário"""
+
+    def db_for_read(self, model, **hints):
+        alias = _replica.get()
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Primário e réplicas têm os mesmos dados
+        bancos = {DEFAULT_DB_ALIAS, *replicas()}
+        if obj1._state.db in bancos and obj2._state.db in bancos:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
@@ -0,0 +1,253 @@
+import contextvars
+import json
+import logging
+import time
+from collections import Counter
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS
+
+from .authentication import user_id_from_request
+from .db.router import escreveu_recentemente, ler_da_replica, marcar_escrita, replicas
+
+
+logger = logging.getLogger('v4vision.requests')
+slow_query_logger = logging.getLogger('v4vision.slow_queries')
+
+# Métricas da requisição em andamento (usado pelo patch do serializer)
+current_metrics = contextvars.ContextVar('v4vision_request_metrics', default=None)
+
+
+class RequestMetrics:
+    """Contadores de uma requisição"""
+
+    def __init__(self, slow_query_ms=200):
+        self.started = time.perf_counter()
+        self.slow_query_ms = slow_query_ms
+        self.view_name = None
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializer_depth = 0
+        self.statements = Counter()
+
+    @property
+    def total_time(self):
+        return time.perf_counter() - self.started
+
+
+def view_name_for(view_func, request):
+    """Nome legível da view, ex.: VendedorViewSet.list"""
+    cls = getattr(view_func, 'cls', None)
+    if cls is None:
+        return getattr(view_func, '__name__', 'unknown')
+
+    method = request.method.lower()
+    actions = getattr(view_func, 'actions', None) or {}
+    return f'{cls.__name__}.{actions.get(method, method)}'
+
+
+def install_serializer_timing():
+    """
+    Mede o tempo gasto em `serializer.data` (DRF). Só o nível mais externo é
+    contado, então serializers aninhados não somam duas vezes.
+    """
+    from rest_framework.serializers import BaseSerializer
+
+    original = BaseSerializer.data
+    if getattr(original.fget, '_v4vision_timed', False):
+        return
+
+    def timed_data(self):
+        metrics = current_metrics.get()
+        if metrics is None:
+            return original.fget(self)
+
+        metrics.serializer_depth += 1
+        started = time.perf_counter()
+        try:
+            return original.fget(self)
+        finally:
+            metrics.serializer_depth -= 1
+            if metrics.serializer_depth == 0:
+                metrics.serializer_time += time.perf_counter() - started
+
+    timed_data._v4vision_timed = True
+    BaseSerializer.data = property(timed_data)
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Conta a query na requisição em andamento. Fica instalado em toda conexão
+    (install_query_metrics); como as métricas estão em um ContextVar, queries
+    feitas em threads auxiliares (views assíncronas) também são contadas.
+    """
+    metrics = current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        metrics.queries += 1
+        metrics.db_time += elapsed
+        metrics.statements[sql] += 1
+        if elapsed * 1000 >= metrics.slow_query_ms:
+            slow_query_logger.warning(json.dumps({
+                'event': 'slow_query',
+                'view': metrics.view_name,
+                'duration_ms': round(elapsed * 1000, 2),
+                'sql': sql[:2000],
+            }))
+
+
+def install_query_metrics(sender, connection, **kwargs):
+    """Sinal connection_created: instala o contador de queries na conexão nova"""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class RequestMetricsMiddleware:
+    """
+    Registra, por requisição, quantidade de queries, tempo de banco, tempo de
+    serialização e tempo total. Expõe tudo no header Server-Timing e em uma
+    linha de log JSON; também loga queries lentas e queries repetidas (N+1)
+    agrupadas pelo nome da view.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'REQUEST_METRICS_ENABLED', True)
+        self.slow_query_ms = getattr(settings, 'SLOW_QUERY_MS', 200)
+        self.duplicate_threshold = getattr(settings, 'DUPLICATE_QUERY_THRESHOLD', 5)
+        # Sob ASGI a cadeia é assíncrona: a view assíncrona roda sem trocar de thread
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+
+        metrics, token = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+
+        self.finish(request, response, metrics)
+        return response
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+
+        metrics, token = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+
+        self.finish(request, response, metrics)
+        return response
+
+    def start(self, request):
+        metrics = RequestMetrics(self.slow_query_ms)
+        request.metrics = metrics
+        return metrics, current_metrics.set(metrics)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = getattr(request, 'metrics', None)
+        if metrics is not None:
+            metrics.view_name = view_name_for(view_func, request)
+
+    def finish(self, request, response, metrics):
+        total_ms = metrics.total_time * 1000
+        db_ms = metrics.db_time * 1000
+        serializer_ms = metrics.serializer_time * 1000
+
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={db_ms:.1f};desc="{metrics.queries} queries"',
+            f'serializer;dur={serializer_ms:.1f}',
+            f'total;dur={total_ms:.1f}',
+        ])
+
+        duplicadas = {
+            sql: count for sql, count in metrics.statements.items()
+            if count >= self.duplicate_threshold
+        }
+        if duplicadas:
+            slow_query_logger.warning(json.dumps({
+                'event': 'duplicate_queries',
+                'view': metrics.view_name,
+                'path': request.path,
+                'queries': [
+                    {'count': count, 'sql': sql[:500]}
+                    for sql, count in sorted(duplicadas.items(), key=lambda item: -item[1])
+                ],
+            }))
+
+        logger.info(json.dumps({
+            'event': 'request',
+            'view': metrics.view_name,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': metrics.queries,
+            'db_ms': round(db_ms, 2),
+            'serializer_ms': round(serializer_ms, 2),
+            'total_ms': round(total_ms, 2),
+        }))
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Requisições de leitura (GET, HEAD, OPTIONS) autenticadas por token leem de
+    uma réplica (core.db.router); escritas ficam no primário. Uma escrita bem
+    sucedida mantém as leituras do cliente no primário por
+    DB_STICKY_PRIMARY_SECONDS (cookie). Sem réplicas configuradas não faz nada.
+    Requisições sem token (admin, login) usam só o primário.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not replicas():
+            return self.get_response(request)
+
+        with ler_da_replica(self.usa_replica(request)):
+            response = self.get_response(request)
+        self.registrar_escrita(request, response)
+        return response
+
+    async def __acall__(self, request):
+        if not replicas():
+            return await self.get_response(request)
+
+        with ler_da_replica(self.usa_replica(request)):
+            response = await self.get_response(request)
+        self.registrar_escrita(request, response)
+        return response
+
+    def usa_replica(self, request):
+        if request.method not in SAFE_METHODS or escreveu_recentemente(request):
+            return False
+        return user_id_from_request(request) is not None
+
+    def registrar_escrita(self, request, response):
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            marcar_escrita(response, secure=request.is_secure())
@@ -3,6 +3,20 @@ from django.db import models
 import uuid
 
 
+class CompanyManager(models.Manager):
+    """Manager de Company com o controle de versão dos dados do dashboard"""
+    
+    def get_data_version(self, company_id):
+        """Versão atual dos dados da empresa (None se ela não existir)"""
+        return self.filter(pk=company_id).values_list('data_version', flat=True).first()
+    
+    def bump_data_version(self, *company_ids):
+        """Incrementa a versão dos dados, invalidando o cache das empresas"""
+        company_ids = {pk for pk in company_ids if pk is not None}
+        if company_ids:
+            self.filter(pk__in=company_ids).update(data_version=models.F('data_version') + 1)
+
+
 class Company(models.Model):
     """Modelo de empresa para multi-tenancy"""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -11,8 +25,16 @@ class Company(models.Model):
     logo = models.ImageField('Logo', upload_to='companies/logos/', blank=True, null=True)
     primary_color = models.CharField('Cor Primária', max_length=7, default='#F97316')
     is_active = models.BooleanField('Ativa', default=True)
+    data_version = models.PositiveBigIntegerField(
+        'Versão dos Dados',
+        default=0,
+        editable=False,
+        help_text='Incrementada a cada escrita nos dados do dashboard (invalida o cache)'
+    )
     created_at = models.DateTimeField('Criado em', auto_now_add=True)
     updated_at = models.DateTimeField('Atualizado em', auto_now=True)
+    
+    objects = CompanyManager()
 
     class Meta:
         verbose_name = 'Empresa'
@@ -23,7 +45,34 @@ class Company(models.Model):
         return self.name
 
 
-class UserManager(BaseUserManager):
+class UserQuerySet(models.QuerySet):
+    """Escritas em lote não disparam os signals: revoga os tokens aqui"""
+    
+    def update(self, **kwargs):
+        if not self._altera_token(kwargs):
+            return super().update(**kwargs)
+        ids = list(self.values_list('pk', flat=True))
+        total = super().update(**kwargs)
+        self._revogar(ids)
+        return total
+    
+    def bulk_update(self, objs, fields, batch_size=None):
+        total = super().bulk_update(objs, fields, batch_size=batch_size)
+        if self._altera_token(fields):
+            self._revogar([obj.pk for obj in objs])
+        return total
+    
+    def _altera_token(self, fields):
+        campos = {self.model._meta.get_field(field).attname for field in fields}
+        return bool(campos & set(self.model.TOKEN_FIELDS))
+    
+    def _revogar(self, ids):
+        from .authentication import revoke_user_tokens
+        if ids:
+            revoke_user_tokens(*ids)
+
+
+class UserManager(BaseUserManager.from_queryset(UserQuerySet)):
     """Manager customizado para User"""
     
     def create_user(self, email, password=None, **extra_fields):
@@ -73,6 +122,9 @@ class User(AbstractUser):
     
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['first_name', 'last_name']
+    
+    # Campos gravados nas claims do JWT (ou que devem invalidar os tokens)
+    TOKEN_FIELDS = ('role', 'company_id', 'is_active', 'password')
 
     class Meta:
         verbose_name = 'Usuário'
@@ -82,6 +134,21 @@ class User(AbstractUser):
     def __str__(self):
         return f"{self.get_full_name()} ({self.email})"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Guarda os campos refletidos no token para revogá-lo se mudarem
+        instance._token_fields_original = {
+            field: instance.__dict__[field]
+            for field in cls.TOKEN_FIELDS if field in instance.__dict__
+        }
+        return instance
+    
+    def token_fields_changed(self):
+        """Se função, empresa, status ou senha mudaram desde a leitura"""
+        original = getattr(self, '_token_fields_original', {})
+        return any(getattr(self, field) != valor for field, valor in original.items())
+    
     @property
     def is_platform_admin(self):
         return self.role == self.Role.PLATFORM_ADMIN
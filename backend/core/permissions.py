@@ -50,12 +50,12 @@ class IsSameCompany(permissions.BasePermission):
             return True
         
         # Verifica se o objeto tem company e se é a mesma do usuário
-        if hasattr(obj, 'company'):
-            return obj.company == request.user.company
+        if hasattr(obj, 'company_id'):
+            return obj.company_id == request.user.company_id
         
         # Se o objeto É uma company, verifica se é a do usuário
         if hasattr(obj, 'users'):  # É uma Company
-            return obj == request.user.company
+            return obj.pk == request.user.company_id
         
         return False
 
@@ -84,8 +84,8 @@ class CanEditOrReadOnly(permissions.BasePermission):
             return True
         
         # Verifica mesma empresa
-        if hasattr(obj, 'company'):
-            if obj.company != request.user.company:
+        if hasattr(obj, 'company_id'):
+            if obj.company_id != request.user.company_id:
                 return False
         
         # Leitura sempre permitida para mesma empresa
@@ -0,0 +1,46 @@
+"""
+JSONRenderer do DRF com orjson.
+
+A saída é a mesma, byte a byte, do JSONRenderer (compacto, UTF-8, U+2028 e
+U+2029 escapados); datas, Decimals, UUIDs em chave etc. passam pelo mesmo
+JSONEncoder do DRF. O que o orjson escreve diferente da stdlib volta para o
+JSONRenderer: indentação pedida pelo cliente, inteiros acima de 64 bits e
+floats fora de 1e-4..1e16 (expoentes: 1e16 x 1e+16, 0.00001 x 1e-05).
+"""
+import re
+
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+# Floats que o orjson escreve diferente da stdlib: 1e16 (1e+16), 3e-7
+# (3e-07) e 0.00001 (1e-05). Strings parecidas só caem no caminho lento.
+EXPOENTE = re.compile(rb'e-?[0-9]+[,}\]]')
+FRACAO_PEQUENA = b'0.0000'
+
+_encoder = JSONEncoder()
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSONRenderer com a serialização do orjson (mesma saída)"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=_encoder.default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        if FRACAO_PEQUENA in ret or EXPOENTE.search(ret):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Como o JSONRenderer: JSON seguro dentro de <script>
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
@@ -1,5 +1,9 @@
 from rest_framework import serializers
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
 from django.contrib.auth import get_user_model
+from .authentication import add_tenant_claims
 from .models import Company
 
 User = get_user_model()
@@ -8,16 +12,25 @@ User = get_user_model()
 class CompanySerializer(serializers.ModelSerializer):
     """Serializer para Company"""
     users_count = serializers.SerializerMethodField()
+    # Preenchidos pelas anotações do CompanyViewSet (list/retrieve)
+    vendedores_count = serializers.IntegerField(read_only=True)
+    ultima_receita_ano = serializers.IntegerField(read_only=True, allow_null=True)
+    ultima_receita_mes = serializers.IntegerField(read_only=True, allow_null=True)
+    ultima_atualizacao = serializers.DateTimeField(read_only=True, allow_null=True)
     
     class Meta:
         model = Company
         fields = [
             'id', 'name', 'slug', 'logo', 'primary_color', 
-            'is_active', 'users_count', 'created_at', 'updated_at'
+            'is_active', 'users_count', 'vendedores_count',
+            'ultima_receita_ano', 'ultima_receita_mes', 'ultima_atualizacao',
+            'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
     
     def get_users_count(self, obj):
+        if hasattr(obj, 'users_total'):
+            return obj.users_total
         return obj.users.count()
 
 
@@ -83,7 +96,7 @@ class ChangePasswordSerializer(serializers.Serializer):
     new_password = serializers.CharField(required=True, min_length=8)
     
     def validate_old_password(self, value):
-        user = self.context['request'].user
+        user = self.context['user']
         if not user.check_password(value):
             raise serializers.ValidationError('Senha atual incorreta.')
         return value
@@ -93,3 +106,46 @@ class LoginSerializer(serializers.Serializer):
     """Serializer para login"""
     email = serializers.EmailField()
     password = serializers.CharField()
+
+
+class TenantTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Login: inclui empresa, função e can_edit nas claims do token"""
+    
+    @classmethod
+    def get_token(cls, user):
+        return add_tenant_claims(super().get_token(user), user)
+
+
+class TenantTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refresh: relê o usuário do banco (uma query por refresh, não por
+    requisição) e regrava as claims, então mudanças de função ou empresa
+    chegam ao próximo token de acesso. Tokens de acesso revogados recebem
+    401 e o frontend já renova pelo refresh.
+    """
+    
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        user = User.objects.filter(
+            pk=refresh.get(api_settings.USER_ID_CLAIM), is_active=True
+        ).first()
+        if user is None:
+            raise AuthenticationFailed('Usuário inativo.', code='user_inactive')
+        
+        add_tenant_claims(refresh, user)
+        data = {'access': str(refresh.access_token)}
+        
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                try:
+                    refresh.blacklist()
+                except AttributeError:
+                    # App token_blacklist não instalado
+                    pass
+            
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data['refresh'] = str(refresh)
+        
+        return data
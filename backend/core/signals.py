@@ -0,0 +1,20 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import revoke_user_tokens
+from .models import User
+
+
+@receiver(post_save, sender=User, dispatch_uid='jwt_user_save')
+def revogar_tokens_alterados(sender, instance, created, **kwargs):
+    """Mudança de função, empresa, status ou senha revoga os tokens emitidos"""
+    if not created and instance.token_fields_changed():
+        revoke_user_tokens(instance.pk)
+    instance._token_fields_original = {
+        field: getattr(instance, field) for field in User.TOKEN_FIELDS
+    }
+
+
+@receiver(post_delete, sender=User, dispatch_uid='jwt_user_delete')
+def revogar_tokens_removido(sender, instance, **kwargs):
+    revoke_user_tokens(instance.pk)
@@ -1,3 +1,5 @@
+import os
+
 from rest_framework import viewsets, status, generics
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -5,11 +7,15 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import get_user_model
+from django.db.models import Count, IntegerField, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
 
+from .authentication import get_db_user
+from .db.pool import pool_stats
 from .models import Company
 from .serializers import (
-    CompanySerializer, UserSerializer, UserCreateSerializer,
-    ChangePasswordSerializer
+    CompanySerializer, CompanyMinimalSerializer, UserSerializer,
+    UserCreateSerializer, ChangePasswordSerializer
 )
 from .permissions import IsPlatformAdmin, IsCompanyAdmin, CanEditOrReadOnly
 
@@ -23,24 +29,90 @@ class CompanyViewSet(viewsets.ModelViewSet):
     lookup_field = 'slug'
     
     def get_permissions(self):
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'minimal']:
             # Platform admin vê todas, outros veem só a sua
             return [IsAuthenticated()]
         return [IsPlatformAdmin()]
     
+    def get_serializer_class(self):
+        if self.action == 'minimal':
+            return CompanyMinimalSerializer
+        return CompanySerializer
+    
     def get_queryset(self):
         user = self.request.user
         if user.is_platform_admin:
-            return Company.objects.all()
+            qs = Company.objects.all()
         # Usuário comum só vê sua própria empresa
-        if user.company:
-            return Company.objects.filter(id=user.company.id)
-        return Company.objects.none()
+        elif user.company_id:
+            qs = Company.objects.filter(id=user.company_id)
+        else:
+            return Company.objects.none()
+        
+        if self.action == 'minimal':
+            return qs.only('id', 'name', 'slug', 'logo', 'primary_color')
+        if self.action in ['list', 'retrieve']:
+            return self.annotate_stats(qs)
+        return qs
+    
+    @staticmethod
+    def annotate_stats(qs):
+        """Anota as estatísticas de cada empresa em uma única query"""
+        from dashboard.models import (
+            Vendedor, ReceitaMensal, VendaVendedor, GestaoSemanal, Estrategia
+        )
+        
+        def contagem(model):
+            return Coalesce(
+                Subquery(
+                    model.objects.filter(company=OuterRef('pk'))
+                    .order_by()
+                    .values('company')
+                    .annotate(total=Count('pk'))
+                    .values('total'),
+                    output_field=IntegerField()
+                ),
+                0
+            )
+        
+        def ultima_atualizacao(model):
+            return Subquery(
+                model.objects.filter(company=OuterRef('pk'))
+                .order_by()
+                .values('company')
+                .annotate(ultima=Max('updated_at'))
+                .values('ultima')
+            )
+        
+        ultima_receita = ReceitaMensal.objects.filter(
+            company=OuterRef('pk')
+        ).order_by('-ano', '-mes')
+        
+        return qs.annotate(
+            users_total=contagem(User),
+            vendedores_count=contagem(Vendedor),
+            ultima_receita_ano=Subquery(ultima_receita.values('ano')[:1]),
+            ultima_receita_mes=Subquery(ultima_receita.values('mes')[:1]),
+            # GREATEST ignora NULLs no PostgreSQL
+            ultima_atualizacao=Greatest(
+                ultima_atualizacao(ReceitaMensal),
+                ultima_atualizacao(VendaVendedor),
+                ultima_atualizacao(GestaoSemanal),
+                ultima_atualizacao(Estrategia),
+            ),
+        )
+    
+    @action(detail=False, methods=['get'])
+    def minimal(self, request):
+        """Listagem leve (sem estatísticas e sem paginação) para seletores"""
+        serializer = self.get_serializer(self.get_queryset(), many=True)
+        return Response(serializer.data)
 
 
 class UserViewSet(viewsets.ModelViewSet):
     """ViewSet para gerenciamento de usuários"""
-    queryset = User.objects.all()
+    # company_data do serializer lê a empresa de cada usuário
+    queryset = User.objects.select_related('company')
     
     def get_serializer_class(self):
         if self.action == 'create':
@@ -57,21 +129,22 @@ class UserViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         user = self.request.user
         if user.is_platform_admin:
-            return User.objects.all()
+            return self.queryset.all()
         # Admin da empresa vê usuários da sua empresa
-        if user.is_company_admin and user.company:
-            return User.objects.filter(company=user.company)
+        if user.is_company_admin and user.company_id:
+            return self.queryset.filter(company_id=user.company_id)
         # Usuário comum não lista outros
-        return User.objects.filter(id=user.id)
+        return self.queryset.filter(id=user.id)
     
     @action(detail=False, methods=['get', 'patch'])
     def me(self, request):
         """Retorna ou atualiza dados do usuário logado"""
+        user = get_db_user(request.user)
         if request.method == 'GET':
-            serializer = UserSerializer(request.user)
+            serializer = UserSerializer(user)
             return Response(serializer.data)
         
-        serializer = UserSerializer(request.user, data=request.data, partial=True)
+        serializer = UserSerializer(user, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
         serializer.save()
         return Response(serializer.data)
@@ -79,11 +152,14 @@ class UserViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['post'])
     def change_password(self, request):
         """Altera senha do usuário logado"""
-        serializer = ChangePasswordSerializer(data=request.data, context={'request': request})
+        user = get_db_user(request.user)
+        serializer = ChangePasswordSerializer(
+            data=request.data, context={'request': request, 'user': user}
+        )
         serializer.is_valid(raise_exception=True)
         
-        request.user.set_password(serializer.validated_data['new_password'])
-        request.user.save()
+        user.set_password(serializer.validated_data['new_password'])
+        user.save()
         
         return Response({'message': 'Senha alterada com sucesso.'})
 
@@ -111,3 +187,15 @@ class LogoutView(generics.GenericAPIView):
                 {'error': 'Token inválido.'},
                 status=status.HTTP_400_BAD_REQUEST
             )
+
+
+class MetricsView(generics.GenericAPIView):
+    """Estado e contadores do pool de conexões deste processo (apenas platform admin)"""
+    permission_classes = [IsPlatformAdmin]
+    
+    def get(self, request):
+        # Contadores por processo: cada worker do gunicorn tem o seu pool
+        return Response({
+            'pid': os.getpid(),
+            'database': pool_stats(),
+        })
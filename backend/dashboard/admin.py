@@ -1,28 +1,47 @@
 from django.contrib import admin
+
+from core.admin import EmpresaAdminMixin, EmpresaListFilter
 from .models import (
-    Vendedor, ReceitaMensal, VendaVendedor,
-    Estrategia, InvestimentoMensal, GestaoSemanal, Protocolo
+    Vendedor, ReceitaMensal, RetrospectivaAnual, VendaVendedor,
+    Estrategia, InvestimentoMensal, GestaoSemanal, Protocolo,
+    AlertaRoas, AvaliacaoRoas, Tarefa
 )
 
 
 @admin.register(Vendedor)
-class VendedorAdmin(admin.ModelAdmin):
+class VendedorAdmin(EmpresaAdminMixin, admin.ModelAdmin):
     list_display = ['nome', 'company', 'email', 'is_active']
-    list_filter = ['company', 'is_active']
-    search_fields = ['nome', 'email']
+    list_filter = [('company', EmpresaListFilter), 'is_active']
+    search_fields = ['nome', 'email', 'company__name']
 
 
 @admin.register(ReceitaMensal)
-class ReceitaMensalAdmin(admin.ModelAdmin):
+class ReceitaMensalAdmin(EmpresaAdminMixin, admin.ModelAdmin):
     list_display = ['company', 'ano', 'mes', 'receita', 'investimento', 'leads']
-    list_filter = ['company', 'ano', 'mes']
+    list_filter = [('company', EmpresaListFilter), 'ano', 'mes']
+    search_fields = ['company__name']
     ordering = ['-ano', '-mes']
 
 
+@admin.register(RetrospectivaAnual)
+class RetrospectivaAnualAdmin(EmpresaAdminMixin, admin.ModelAdmin):
+    list_display = ['company', 'ano', 'receita_total', 'investimento_total', 'roas_global', 'mes_pico']
+    list_filter = [('company', EmpresaListFilter), 'ano']
+    search_fields = ['company__name']
+    ordering = ['-ano']
+    readonly_fields = [
+        'company', 'ano', 'receita_total', 'investimento_total',
+        'leads_total', 'roas_global', 'mes_pico', 'receita_pico'
+    ]
+
+
 @admin.register(VendaVendedor)
-class VendaVendedorAdmin(admin.ModelAdmin):
+class VendaVendedorAdmin(EmpresaAdminMixin, admin.ModelAdmin):
     list_display = ['vendedor', 'company', 'ano', 'mes', 'valor']
-    list_filter = ['company', 'ano', 'mes']
+    list_filter = [('company', EmpresaListFilter), 'ano', 'mes']
+    search_fields = ['vendedor__nome', 'company__name']
+    list_select_related = ['vendedor', 'company']
+    autocomplete_fields = ['company', 'vendedor']
     ordering = ['-ano', '-mes']
 
 
@@ -32,21 +51,50 @@ class InvestimentoMensalInline(admin.TabularInline):
 
 
 @admin.register(Estrategia)
-class EstrategiaAdmin(admin.ModelAdmin):
+class EstrategiaAdmin(EmpresaAdminMixin, admin.ModelAdmin):
     list_display = ['company', 'ano', 'cenario', 'orcamento_total', 'receita_projetada']
-    list_filter = ['company', 'ano', 'cenario']
+    list_filter = [('company', EmpresaListFilter), 'ano', 'cenario']
+    search_fields = ['company__name']
     inlines = [InvestimentoMensalInline]
 
 
 @admin.register(GestaoSemanal)
-class GestaoSemanalAdmin(admin.ModelAdmin):
+class GestaoSemanalAdmin(EmpresaAdminMixin, admin.ModelAdmin):
     list_display = ['company', 'ano', 'mes', 'semana', 'investimento', 'leads', 'vendas']
-    list_filter = ['company', 'ano', 'mes']
+    list_filter = [('company', EmpresaListFilter), 'ano', 'mes']
+    search_fields = ['company__name']
     ordering = ['-ano', '-mes', '-semana']
 
 
 @admin.register(Protocolo)
-class ProtocoloAdmin(admin.ModelAdmin):
+class ProtocoloAdmin(EmpresaAdminMixin, admin.ModelAdmin):
     list_display = ['company', 'tipo', 'titulo', 'ordem']
-    list_filter = ['company', 'tipo']
+    list_filter = [('company', EmpresaListFilter), 'tipo']
+    search_fields = ['titulo', 'company__name']
     ordering = ['company', 'ordem']
+
+
+@admin.register(AlertaRoas)
+class AlertaRoasAdmin(EmpresaAdminMixin, admin.ModelAdmin):
+    list_display = ['company', 'ano', 'mes', 'periodo', 'semana', 'estrategia', 'roas', 'roas_minimo']
+    list_filter = [('company', EmpresaListFilter), 'ano', 'mes', 'periodo']
+    search_fields = ['company__name']
+    list_select_related = ['company', 'estrategia__company']
+    raw_id_fields = ['estrategia']
+    ordering = ['-ano', '-mes']
+
+
+@admin.register(AvaliacaoRoas)
+class AvaliacaoRoasAdmin(EmpresaAdminMixin, admin.ModelAdmin):
+    list_display = ['company', 'ano', 'mes', 'data_version', 'avaliado_em']
+    readonly_fields = ['company', 'ano', 'mes', 'data_version', 'avaliado_em']
+
+
+@admin.register(Tarefa)
+class TarefaAdmin(EmpresaAdminMixin, admin.ModelAdmin):
+    list_display = ['tipo', 'company', 'status', 'tentativas', 'executar_em', 'concluida_em']
+    list_filter = ['status', 'tipo']
+    search_fields = ['tipo', 'company__name']
+    raw_id_fields = ['criado_por']
+    ordering = ['-created_at']
+    readonly_fields = ['resultado', 'erro', 'worker', 'iniciada_em', 'concluida_em']
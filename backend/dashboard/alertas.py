@@ -0,0 +1,122 @@
+"""
+Avaliador de alertas de ROAS.
+
+Para cada empresa ativa calcula o ROAS da semana atual (última semana com
+dados no mês de referência) e do mês até a data a partir da GestaoSemanal,
+compara com o roas_minimo das estratégias do ano e grava um AlertaRoas para
+cada período abaixo do mínimo. As empresas são divididas em lotes avaliados
+por um pool de processos; cada processo usa uma única conexão com o banco.
+Empresas cuja versão dos dados (Company.data_version) não mudou desde a última
+avaliação do mesmo mês são puladas.
+"""
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+from django.db import connections, transaction
+
+from core.models import Company
+from .models import AlertaRoas, AvaliacaoRoas, Estrategia, GestaoSemanal
+
+
+LOTE_PADRAO = 200
+
+
+def _iniciar_worker():
+    """Processo do pool (fork): descarta conexões herdadas e abre a sua sob demanda"""
+    connections.close_all()
+
+
+def avaliar_lote(company_ids, ano, mes, forcar=False):
+    """Avalia um lote de empresas com um número fixo de queries"""
+    versoes = dict(
+        Company.objects.filter(pk__in=company_ids, is_active=True).values_list('pk', 'data_version')
+    )
+    if not forcar:
+        avaliadas = AvaliacaoRoas.objects.filter(
+            company_id__in=versoes, ano=ano, mes=mes
+        ).values_list('company_id', 'data_version')
+        for company_id, versao in avaliadas:
+            if versoes.get(company_id) == versao:
+                del versoes[company_id]
+
+    resultado = {'avaliadas': len(versoes), 'puladas': len(company_ids) - len(versoes), 'alertas': 0}
+    if not versoes:
+        return resultado
+
+    semanas = {}
+    for company_id, semana, investimento, vendas in GestaoSemanal.objects.filter(
+        company_id__in=versoes, ano=ano, mes=mes
+    ).order_by().values_list('company_id', 'semana', 'investimento', 'vendas'):
+        semanas.setdefault(company_id, []).append((semana, investimento, vendas))
+
+    estrategias = {}
+    for estrategia in Estrategia.objects.filter(
+        company_id__in=versoes, ano=ano
+    ).only('id', 'company_id', 'roas_minimo'):
+        estrategias.setdefault(estrategia.company_id, []).append(estrategia)
+
+    alertas = []
+    for company_id, linhas in semanas.items():
+        semana_atual, investimento_semana, vendas_semana = max(linhas)
+        periodos = [
+            (AlertaRoas.Periodo.SEMANA, semana_atual, investimento_semana, vendas_semana),
+            (AlertaRoas.Periodo.MES, None, sum(l[1] for l in linhas), sum(l[2] for l in linhas)),
+        ]
+        for estrategia in estrategias.get(company_id, []):
+            for periodo, semana, investimento, vendas in periodos:
+                if not investimento:
+                    continue
+                roas = vendas / investimento
+                if roas < estrategia.roas_minimo:
+                    alertas.append(AlertaRoas(
+                        company_id=company_id,
+                        estrategia=estrategia,
+                        ano=ano,
+                        mes=mes,
+                        semana=semana,
+                        periodo=periodo,
+                        investimento=investimento,
+                        vendas=vendas,
+                        roas=round(float(roas), 2),
+                        roas_minimo=estrategia.roas_minimo
+                    ))
+
+    # Os alertas do mês são substituídos pelos da avaliação atual
+    with transaction.atomic():
+        AlertaRoas.objects.filter(company_id__in=versoes, ano=ano, mes=mes).delete()
+        AlertaRoas.objects.bulk_create(alertas, batch_size=1000)
+        AvaliacaoRoas.objects.bulk_create(
+            [
+                AvaliacaoRoas(company_id=company_id, data_version=versao, ano=ano, mes=mes)
+                for company_id, versao in versoes.items()
+            ],
+            update_conflicts=True,
+            unique_fields=['company'],
+            update_fields=['data_version', 'ano', 'mes', 'avaliado_em']
+        )
+
+    resultado['alertas'] = len(alertas)
+    return resultado
+
+
+def avaliar_empresas(ano, mes, workers=1, lote=LOTE_PADRAO, forcar=False, company_ids=None):
+    """Avalia todas as empresas ativas (ou `company_ids`) em lotes paralelos"""
+    empresas = Company.objects.filter(is_active=True)
+    if company_ids:
+        empresas = empresas.filter(pk__in=company_ids)
+    ids = list(empresas.order_by('pk').values_list('pk', flat=True))
+    lotes = [ids[i:i + lote] for i in range(0, len(ids), lote)]
+
+    total = Counter(empresas=len(ids), avaliadas=0, puladas=0, alertas=0)
+    if workers <= 1 or len(lotes) <= 1:
+        for company_ids in lotes:
+            total.update(avaliar_lote(company_ids, ano, mes, forcar))
+        return dict(total)
+
+    # Conexões abertas no processo pai não podem ser reaproveitadas pelos filhos
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_iniciar_worker) as pool:
+        for resultado in pool.map(avaliar_lote, lotes, repeat(ano), repeat(mes), repeat(forcar)):
+            total.update(resultado)
+    return dict(total)
@@ -0,0 +1,156 @@
+"""
+Variantes assíncronas (ASGI) das leituras do dashboard.
+
+Com DASHBOARD_ASYNC_VIEWS ligado (padrão em v4vision.asgi), o GET de list e
+retrieve dos viewsets do dashboard e das actions retrospectiva e
+comparativo_vendedores é atendido por estas views; os demais métodos da mesma
+rota seguem no viewset síncrono. Autenticação, permissões, escopo de empresa,
+filtros, serializers e cache são os do próprio viewset: a view assíncrona o
+instancia e só troca o handler.
+
+A requisição passa pelo APIView.dispatch do DRF (autenticação, permissões,
+exceções) e só a action é atendida pelo handler assíncrono. O ORM assíncrono
+do Django 4.2 executa as queries de uma requisição em uma única thread, uma
+depois da outra; as consultas de uma resposta vão para `em_paralelo`, que as
+executa em threads do pool, cada uma com a sua conexão, e ao mesmo tempo
+quando são independentes (consolidado e série mensal da retrospectiva).
+"""
+import asyncio
+import functools
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.db import close_old_connections
+from django.http import Http404
+from django.urls import path
+from rest_framework import mixins
+from rest_framework.response import Response
+
+from .cache import tenant_cached_async
+from .views import (
+    VendedorViewSet, ReceitaMensalViewSet, VendaVendedorViewSet,
+    EstrategiaViewSet, GestaoSemanalViewSet, ProtocoloViewSet,
+    consolidados_retrospectiva, receitas_retrospectiva, resumir_retrospectiva,
+    comparativo_vendedores_qs, item_comparativo
+)
+
+
+def _isolada(consulta):
+    """Roda a consulta em uma thread do pool, com o ciclo de conexão de uma requisição"""
+    def executar():
+        close_old_connections()
+        try:
+            return consulta()
+        finally:
+            close_old_connections()
+    return executar
+
+
+async def em_paralelo(*consultas):
+    """Executa funções síncronas de leitura ao mesmo tempo; retorna os resultados em ordem"""
+    return await asyncio.gather(*(
+        sync_to_async(_isolada(consulta), thread_sensitive=False)()
+        for consulta in consultas
+    ))
+
+
+async def listar(view, request, **kwargs):
+    """List do DRF (filtros, paginação do viewset e COUNT) em uma thread do pool"""
+    response, = await em_paralelo(lambda: mixins.ListModelMixin.list(view, request, **kwargs))
+    return response
+
+
+async def detalhar(view, request, **kwargs):
+    queryset = await sync_to_async(lambda: view.filter_queryset(view.get_queryset()))()
+    lookup_url_kwarg = view.lookup_url_kwarg or view.lookup_field
+    try:
+        obj = await queryset.aget(**{view.lookup_field: kwargs[lookup_url_kwarg]})
+    except queryset.model.DoesNotExist:
+        raise Http404
+    view.check_object_permissions(request, obj)
+    return Response(await sync_to_async(lambda: view.get_serializer(obj).data)())
+
+
+async def retrospectiva(view, request, **kwargs):
+    """Consolidado do ano (totais e pico) e série mensal ao mesmo tempo"""
+    ano = request.query_params.get('ano', 2025)
+    consolidados, receitas_mensais = await em_paralelo(
+        lambda: consolidados_retrospectiva(view, ano),
+        lambda: receitas_retrospectiva(view, ano)
+    )
+    return Response(resumir_retrospectiva(ano, consolidados, receitas_mensais))
+
+
+async def comparativo_vendedores(view, request, **kwargs):
+    ano = request.query_params.get('ano', 2025)
+    return Response([
+        item_comparativo(item) async for item in comparativo_vendedores_qs(view, ano)
+    ])
+
+
+def viewset_assincrono(viewset_class, action, handler):
+    """Subclasse do viewset com a action atendida pelo handler assíncrono"""
+    original = getattr(viewset_class, action)
+
+    @functools.wraps(original)
+    def metodo(self, request, *args, **kwargs):
+        # Chamado pelo APIView.dispatch na thread da requisição; o handler
+        # roda no event loop do servidor
+        return async_to_sync(handler)(self, request, **kwargs)
+
+    return type(viewset_class.__name__, (viewset_class,), {action: metodo})
+
+
+def rota(viewset_class, action, handler, sincrona):
+    """GET pelo handler assíncrono; outros métodos pela view síncrona do router"""
+    if getattr(getattr(viewset_class, action), 'tenant_cached', False):
+        handler = tenant_cached_async(handler)
+
+    # Mesmos initkwargs (basename, detail, suffix...) da view do router
+    assincrona = viewset_assincrono(viewset_class, action, handler).as_view(
+        {'get': action}, **sincrona.initkwargs
+    )
+
+    async def view(request, *args, **kwargs):
+        callback = assincrona if request.method == 'GET' else sincrona
+        return await sync_to_async(callback)(request, *args, **kwargs)
+
+    # csrf_exempt do Django 4.2 não preserva views assíncronas: marca direto
+    view.csrf_exempt = True
+    # Usados pelo RequestMetricsMiddleware para nomear a view
+    view.cls = viewset_class
+    view.actions = {**getattr(sincrona, 'actions', {}), 'get': action}
+    return view
+
+
+VIEWSETS_ASSINCRONOS = [
+    VendedorViewSet, ReceitaMensalViewSet, VendaVendedorViewSet,
+    EstrategiaViewSet, GestaoSemanalViewSet, ProtocoloViewSet,
+]
+
+ACOES_ASSINCRONAS = {
+    ReceitaMensalViewSet: {
+        'retrospectiva': retrospectiva,
+        'comparativo_vendedores': comparativo_vendedores,
+    },
+}
+
+
+def async_urlpatterns(router):
+    """Rotas assíncronas com os mesmos caminhos das do router (incluir antes delas)"""
+    sincronas = {pattern.name: pattern.callback for pattern in router.urls if pattern.name}
+    padroes = []
+    for prefix, viewset, basename in router.registry:
+        if viewset not in VIEWSETS_ASSINCRONOS:
+            continue
+
+        acoes = ACOES_ASSINCRONAS.get(viewset, {})
+        for extra in viewset.get_extra_actions():
+            if extra.__name__ in acoes:
+                padroes.append(path(
+                    f'{prefix}/{extra.url_path}/',
+                    rota(viewset, extra.__name__, acoes[extra.__name__], sincronas[f'{basename}-{extra.url_name}'])
+                ))
+        padroes.append(path(f'{prefix}/', rota(viewset, 'list', listar, sincronas[f'{basename}-list'])))
+        # Só UUIDs: caminhos de outras actions (export, bulk...) seguem para o router
+        padroes.append(path(f'{prefix}/<uuid:pk>/', rota(viewset, 'retrieve', detalhar, sincronas[f'{basename}-detail'])))
+    return padroes
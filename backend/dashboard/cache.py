@@ -0,0 +1,124 @@
+"""
+Cache de respostas do dashboard versionado por empresa.
+
+Cada empresa tem um `data_version` (core.Company) incrementado a cada escrita
+nos modelos do dashboard. A chave do cache e o ETag incluem essa versão, então
+qualquer escrita invalida as respostas da empresa em todos os workers, mesmo
+com o backend de memória local (cada processo só deixa de encontrar a chave).
+"""
+import functools
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from core.models import Company
+
+
+def get_cache():
+    return caches[getattr(settings, 'DASHBOARD_CACHE_ALIAS', 'dashboard')]
+
+
+def build_cache_key(request, view, company_id, version):
+    params = sorted(
+        (k, v) for k in request.query_params for v in request.query_params.getlist(k)
+    )
+    raw = '|'.join([
+        str(company_id),
+        str(version),
+        view.__class__.__name__,
+        view.action or '',
+        repr(params),
+        request.META.get('HTTP_ACCEPT', ''),
+    ])
+    return 'resp:' + hashlib.sha256(raw.encode()).hexdigest()
+
+
+def etag_for(key):
+    return f'"{key[5:37]}"'
+
+
+def finalize_cached(response, etag):
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    patch_vary_headers(response, ['Authorization'])
+    return response
+
+
+def tenant_cached(view_method):
+    """
+    Cacheia a resposta de uma action por (empresa, endpoint, query params) e
+    responde 304 quando o If-None-Match bate com a versão atual.
+
+    Só atua quando a requisição é de uma única empresa; listagens de todas as
+    empresas (platform admin sem ?company=) não são cacheadas.
+    """
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        company_id = self.get_company_id()
+        version = Company.objects.get_data_version(company_id) if company_id else None
+        if version is None:
+            return view_method(self, request, *args, **kwargs)
+
+        key = build_cache_key(request, self, company_id, version)
+        etag = etag_for(key)
+
+        if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            cache = get_cache()
+            data = cache.get(key)
+            if data is None:
+                response = view_method(self, request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                cache.set(key, response.data)
+            else:
+                response = Response(data)
+
+        return finalize_cached(response, etag)
+
+    # As variantes assíncronas (async_views.py) cacheiam as mesmas actions
+    wrapper.tenant_cached = True
+    return wrapper
+
+
+def tenant_cached_async(handler):
+    """
+    tenant_cached para as views assíncronas. Usa a mesma chave (classe do
+    viewset e action), então o cache é compartilhado com as views síncronas.
+    """
+    @functools.wraps(handler)
+    async def wrapper(view, request, *args, **kwargs):
+        company_id = view.get_company_id()
+        version = None
+        if company_id:
+            version = await Company.objects.filter(pk=company_id).values_list(
+                'data_version', flat=True
+            ).afirst()
+        if version is None:
+            return await handler(view, request, *args, **kwargs)
+
+        key = build_cache_key(request, view, company_id, version)
+        etag = etag_for(key)
+
+        if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            cache = get_cache()
+            data = await cache.aget(key)
+            if data is None:
+                response = await handler(view, request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                await cache.aset(key, response.data)
+            else:
+                response = Response(data)
+
+        return finalize_cached(response, etag)
+
+    return wrapper
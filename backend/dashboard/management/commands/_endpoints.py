@@ -0,0 +1,32 @@
+"""Rotas GET do router da API, compartilhadas pelos comandos de medição"""
+from v4vision.urls import router
+
+
+def iter_get_endpoints(ano):
+    """Todas as rotas GET do router: list, retrieve e actions extras"""
+    for prefix, viewset, basename in router.registry:
+        if hasattr(viewset, 'list'):
+            yield basename, f'/api/{prefix}/', None
+        if hasattr(viewset, 'retrieve'):
+            yield f'{basename}-detail', f'/api/{prefix}/{{lookup}}/', viewset
+        for extra in viewset.get_extra_actions():
+            if 'get' not in extra.mapping:
+                continue
+            base = f'/api/{prefix}/{{lookup}}/' if extra.detail else f'/api/{prefix}/'
+            yield (
+                f'{basename}-{extra.url_name}',
+                f'{base}{extra.url_path}/?ano={ano}',
+                viewset if extra.detail else None
+            )
+
+
+def lookup_for(viewset, company):
+    """Primeiro objeto visível pelo usuário, para as rotas de detalhe"""
+    model = viewset.queryset.model
+    qs = model.objects.all()
+    if model is company.__class__:
+        qs = qs.filter(pk=company.pk)
+    elif any(f.name == 'company' for f in model._meta.fields):
+        qs = qs.filter(company=company)
+    obj = qs.first()
+    return getattr(obj, viewset.lookup_field) if obj else None
@@ -0,0 +1,44 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from dashboard.alertas import LOTE_PADRAO, avaliar_empresas
+
+
+class Command(BaseCommand):
+    help = (
+        'Avalia o ROAS da semana atual e do mês até a data (GestaoSemanal) de '
+        'todas as empresas ativas contra o roas_minimo das estratégias e grava '
+        'os alertas. Empresas sem dados novos desde a última execução são puladas'
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--ano', type=int, help='Ano de referência (padrão: atual)')
+        parser.add_argument('--mes', type=int, help='Mês de referência (padrão: atual)')
+        parser.add_argument('--company', action='append', help='ID da empresa (repetível; padrão: todas)')
+        parser.add_argument(
+            '--workers', type=int, default=min(4, os.cpu_count() or 1),
+            help='Processos em paralelo; cada um abre uma conexão com o banco (padrão: %(default)s)'
+        )
+        parser.add_argument('--lote', type=int, default=LOTE_PADRAO, help='Empresas por lote')
+        parser.add_argument('--force', action='store_true', help='Reavalia mesmo sem dados novos')
+    
+    def handle(self, *args, **options):
+        hoje = timezone.localdate()
+        inicio = time.perf_counter()
+        total = avaliar_empresas(
+            ano=options['ano'] or hoje.year,
+            mes=options['mes'] or hoje.month,
+            workers=options['workers'],
+            lote=options['lote'],
+            forcar=options['force'],
+            company_ids=options['company']
+        )
+        
+        self.stdout.write(self.style.SUCCESS(
+            f"{total['empresas']} empresa(s): {total['avaliadas']} avaliada(s), "
+            f"{total['puladas']} sem dados novos, {total['alertas']} alerta(s) "
+            f"em {time.perf_counter() - inicio:.1f}s."
+        ))
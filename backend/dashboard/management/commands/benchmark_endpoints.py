@@ -0,0 +1,133 @@
+import json
+import platform
+import statistics
+import time
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.models import User
+from dashboard.cache import get_cache
+from dashboard.seed import seed_tenants
+from ._endpoints import iter_get_endpoints, lookup_for
+
+
+class Command(BaseCommand):
+    help = (
+        'Mede o tempo de cada endpoint do router da API em vários tamanhos de '
+        'base (dados sintéticos em transação com rollback) e grava um relatório JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', default='10,100',
+            help='Quantidades de empresas a semear, separadas por vírgula'
+        )
+        parser.add_argument('--vendedores', type=int, default=8, help='Vendedores por empresa')
+        parser.add_argument('--anos', type=int, default=3, help='Anos de histórico')
+        parser.add_argument('--repeat', type=int, default=5, help='Repetições por endpoint')
+        parser.add_argument('--seed', type=int, default=42, help='Semente do gerador')
+        parser.add_argument(
+            '--warm-cache', action='store_true',
+            help='Não limpa o cache de respostas entre as repetições'
+        )
+        parser.add_argument('--output', default='benchmark.json', help='Arquivo do relatório')
+
+    def handle(self, *args, **options):
+        report = {
+            'generated_at': timezone.now().isoformat(),
+            'environment': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+            },
+            'options': {
+                key: options[key]
+                for key in ('vendedores', 'anos', 'repeat', 'seed', 'warm_cache')
+            },
+            'sizes': {},
+        }
+
+        for size in [int(s) for s in options['sizes'].split(',') if s.strip()]:
+            self.stdout.write(f'Base com {size} empresa(s)...')
+            with transaction.atomic():
+                inicio = time.perf_counter()
+                seed = seed_tenants(
+                    companies=size,
+                    vendedores=options['vendedores'],
+                    anos=options['anos'],
+                    seed=options['seed'],
+                    prefix='bench'
+                )
+                resultado = {
+                    'seed_seconds': round(time.perf_counter() - inicio, 3),
+                    'rows': seed.linhas,
+                    'endpoints': self.run(seed, options),
+                }
+                transaction.set_rollback(True)
+            report['sizes'][str(size)] = resultado
+
+        with open(options['output'], 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+        self.stdout.write(self.style.SUCCESS(f'Relatório gravado em {options["output"]}.'))
+
+    def run(self, seed, options):
+        platform_admin = User.objects.filter(role=User.Role.PLATFORM_ADMIN).first()
+        if platform_admin is None:
+            platform_admin = User(
+                email='bench-platform@v4vision.local',
+                first_name='Bench',
+                last_name='Platform',
+                role=User.Role.PLATFORM_ADMIN
+            )
+            platform_admin.set_unusable_password()
+            platform_admin.save()
+
+        company = seed.companies[0]
+        perfis = {'company_admin': seed.users[0], 'platform_admin': platform_admin}
+        ano = seed.anos[-1]
+        cache = get_cache()
+        resultados = {}
+
+        for perfil, user in perfis.items():
+            client = APIClient()
+            client.force_authenticate(user)
+
+            for nome, rota, viewset in iter_get_endpoints(ano):
+                url = rota
+                if viewset is not None:
+                    lookup = lookup_for(viewset, company)
+                    if lookup is None:
+                        continue
+                    url = rota.format(lookup=lookup)
+
+                tempos, queries, status_code = [], 0, None
+                for _ in range(options['repeat']):
+                    if not options['warm_cache']:
+                        cache.clear()
+                    with override_settings(ALLOWED_HOSTS=['*']):
+                        with CaptureQueriesContext(connection) as ctx:
+                            inicio = time.perf_counter()
+                            response = client.get(url)
+                            tempos.append((time.perf_counter() - inicio) * 1000)
+                    queries = len(ctx.captured_queries)
+                    status_code = response.status_code
+
+                tempos.sort()
+                resultados[f'{perfil}:{nome}'] = {
+                    'url': rota,
+                    'status': status_code,
+                    'queries': queries,
+                    'bytes': len(response.content),
+                    'min_ms': round(tempos[0], 2),
+                    'mean_ms': round(statistics.mean(tempos), 2),
+                    'p50_ms': round(statistics.median(tempos), 2),
+                    'p95_ms': round(tempos[min(len(tempos) - 1, int(len(tempos) * 0.95))], 2),
+                }
+
+        return resultados
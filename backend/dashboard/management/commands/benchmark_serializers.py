@@ -0,0 +1,109 @@
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from core.renderers import ORJSONRenderer
+from dashboard.seed import seed_tenants
+from dashboard.views import (
+    ReceitaMensalViewSet, VendaVendedorViewSet, GestaoSemanalViewSet, ProtocoloViewSet
+)
+
+
+VIEWSETS = [ReceitaMensalViewSet, VendaVendedorViewSet, GestaoSemanalViewSet, ProtocoloViewSet]
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara a serialização das listagens pelo ModelSerializer + JSONRenderer '
+        'com a leitura rápida (.values() + ValuesSerializer + ORJSONRenderer) em '
+        'dados sintéticos (transação com rollback); falha se os bytes diferirem'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--companies', type=int, default=20, help='Empresas a semear')
+        parser.add_argument('--linhas', type=int, default=5000, help='Linhas serializadas por modelo')
+        parser.add_argument('--repeat', type=int, default=5, help='Repetições por caminho')
+        parser.add_argument('--seed', type=int, default=42, help='Semente do gerador')
+        parser.add_argument('--output', help='Grava o relatório JSON neste arquivo')
+
+    def handle(self, *args, **options):
+        relatorio = {}
+        with transaction.atomic():
+            seed_tenants(companies=options['companies'], seed=options['seed'], prefix='bench-serializers')
+            for viewset in VIEWSETS:
+                relatorio[viewset.queryset.model.__name__] = self.medir(viewset, options)
+            transaction.set_rollback(True)
+
+        for modelo, r in relatorio.items():
+            self.stdout.write(
+                f'{modelo}: {r["linhas"]} linhas, {r["bytes"]} bytes | '
+                f'ModelSerializer {r["model_serializer_ms"]} ms + JSONRenderer {r["json_renderer_ms"]} ms | '
+                f'ValuesSerializer {r["values_serializer_ms"]} ms + ORJSONRenderer {r["orjson_renderer_ms"]} ms | '
+                f'{r["speedup"]}x'
+            )
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(relatorio, f, indent=2, sort_keys=True)
+            self.stdout.write(self.style.SUCCESS(f'Relatório gravado em {options["output"]}.'))
+
+    def medir(self, viewset, options):
+        """Mediana de cada etapa (ms) sobre as mesmas linhas pelos dois caminhos"""
+        qs = viewset.queryset.all()
+        if viewset.select_related_fields:
+            qs = qs.select_related(*viewset.select_related_fields)
+        if viewset.only_fields:
+            qs = qs.only(*viewset.only_fields)
+        qs = qs.order_by('pk')
+        values_serializer = viewset.values_serializer_class
+
+        instancias = self.repetir(list(qs[:options['linhas']]), options['linhas'])
+        linhas = self.repetir(list(values_serializer.values(qs)[:options['linhas']]), options['linhas'])
+        if not instancias:
+            raise CommandError(f'Nenhuma linha de {qs.model.__name__} semeada.')
+
+        tempos = {etapa: [] for etapa in ('model_serializer', 'json_renderer', 'values_serializer', 'orjson_renderer')}
+        for _ in range(options['repeat']):
+            completo, ms_serializer, ms_render = self.serializar(
+                lambda: viewset.serializer_class(instancias, many=True).data, JSONRenderer()
+            )
+            tempos['model_serializer'].append(ms_serializer)
+            tempos['json_renderer'].append(ms_render)
+
+            rapido, ms_serializer, ms_render = self.serializar(
+                lambda: values_serializer(linhas, many=True).data, ORJSONRenderer()
+            )
+            tempos['values_serializer'].append(ms_serializer)
+            tempos['orjson_renderer'].append(ms_render)
+
+            if completo != rapido:
+                raise CommandError(f'{qs.model.__name__}: a leitura rápida gerou bytes diferentes.')
+
+        medianas = {etapa: statistics.median(valores) for etapa, valores in tempos.items()}
+        antes = medianas['model_serializer'] + medianas['json_renderer']
+        depois = medianas['values_serializer'] + medianas['orjson_renderer']
+        return {
+            'linhas': len(instancias),
+            'bytes': len(completo),
+            **{f'{etapa}_ms': round(valor, 2) for etapa, valor in medianas.items()},
+            'speedup': round(antes / depois, 1) if depois else None,
+        }
+
+    def serializar(self, dados, renderer):
+        inicio = time.perf_counter()
+        data = dados()
+        meio = time.perf_counter()
+        conteudo = renderer.render(data)
+        fim = time.perf_counter()
+        return conteudo, (meio - inicio) * 1000, (fim - meio) * 1000
+
+    @staticmethod
+    def repetir(linhas, total):
+        """Repete as linhas até `total` (tabelas pequenas, como protocolos)"""
+        if not linhas:
+            return linhas
+        return (linhas * (total // len(linhas) + 1))[:total]
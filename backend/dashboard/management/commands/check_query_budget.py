@@ -0,0 +1,125 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+
+from core.models import User
+from core.serializers import TenantTokenObtainPairSerializer
+from dashboard.cache import get_cache
+from dashboard.seed import seed_tenants
+from ._endpoints import iter_get_endpoints, lookup_for
+
+
+# Máximo de queries por endpoint com cache frio. Listagens: COUNT + página;
+# actions cacheadas somam a leitura da versão da empresa.
+DEFAULT_BUDGET = 2
+QUERY_BUDGETS = {
+    'receita-comparativo-vendedores': 2,
+    'receita-retrospectiva': 3,
+    'estrategia': 4,
+    'estrategia-simulacao': 4,
+    'protocolo': 3,
+    'dashboard-bundle': 8,
+}
+
+# Base pequena e base maior: um endpoint sem N+1 faz o mesmo número de queries nas duas
+SIZES = [
+    {'companies': 1, 'vendedores': 2, 'anos': 1},
+    {'companies': 3, 'vendedores': 8, 'anos': 2},
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Conta as queries de cada rota GET da API em duas bases sintéticas '
+        '(transação com rollback) e falha se algum endpoint passar do orçamento '
+        'ou fizer mais queries quando há mais linhas (N+1)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose-queries', action='store_true', help='Imprime o SQL dos endpoints com falha')
+
+    def handle(self, *args, **options):
+        medicoes = []
+        for size in SIZES:
+            with transaction.atomic():
+                seed = seed_tenants(prefix='budget-check', **size)
+                medicoes.append(self.measure(seed))
+                transaction.set_rollback(True)
+
+        pequena, grande = medicoes
+        falhas = []
+        for nome, (queries, sql) in grande.items():
+            budget = QUERY_BUDGETS.get(nome.split(':', 1)[1], DEFAULT_BUDGET)
+            antes = pequena.get(nome, (queries, []))[0]
+            if queries > budget:
+                falhas.append((f'{nome}: {queries} queries (orçamento {budget})', sql))
+            elif queries > antes:
+                falhas.append((f'{nome}: {antes} -> {queries} queries com mais linhas (N+1)', sql))
+
+        if falhas:
+            for mensagem, sql in falhas:
+                self.stderr.write(mensagem)
+                if options['verbose_queries']:
+                    for query in sql:
+                        self.stderr.write(f'  {query}')
+            raise CommandError(f'{len(falhas)} endpoint(s) fora do orçamento de queries.')
+
+        self.stdout.write(self.style.SUCCESS(f'{len(grande)} endpoint(s) dentro do orçamento de queries.'))
+
+    def measure(self, seed):
+        """Queries de cada rota GET por perfil: {perfil:rota: (total, sql)}"""
+        platform_admin = User.objects.filter(role=User.Role.PLATFORM_ADMIN).first()
+        if platform_admin is None:
+            platform_admin = User(
+                email='budget-platform@v4vision.local',
+                first_name='Budget',
+                last_name='Platform',
+                role=User.Role.PLATFORM_ADMIN
+            )
+            platform_admin.set_unusable_password()
+            platform_admin.save()
+
+        company = seed.companies[0]
+        perfis = {'company_admin': seed.users[0], 'platform_admin': platform_admin}
+        cache = get_cache()
+        resultados = {}
+
+        for perfil, user in perfis.items():
+            # Token real: mede o caminho de autenticação por claims
+            client = APIClient()
+            token = TenantTokenObtainPairSerializer.get_token(user).access_token
+            client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+            for nome, rota, viewset in iter_get_endpoints(seed.anos[-1]):
+                url = rota
+                if viewset is not None:
+                    lookup = lookup_for(viewset, company)
+                    if lookup is None:
+                        continue
+                    url = rota.format(lookup=lookup)
+
+                response, ctx = self.get(client, cache, url)
+                if response.status_code == 400 and perfil == 'platform_admin':
+                    # Endpoints de uma única empresa exigem ?company= do platform admin
+                    separador = '&' if '?' in url else '?'
+                    response, ctx = self.get(client, cache, f'{url}{separador}company={company.pk}')
+
+                if response.status_code != 200:
+                    raise CommandError(f'{perfil} {url}: status {response.status_code}')
+                resultados[f'{perfil}:{nome}'] = (
+                    len(ctx.captured_queries),
+                    [query['sql'] for query in ctx.captured_queries]
+                )
+
+        return resultados
+
+    def get(self, client, cache, url):
+        cache.clear()
+        # Autenticação pelas claims: conta só as queries do endpoint
+        with override_settings(ALLOWED_HOSTS=['*'], JWT_STATELESS_AUTH=True):
+            with CaptureQueriesContext(connection) as ctx:
+                response = client.get(url)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+        return response, ctx
@@ -0,0 +1,133 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+
+from dashboard.seed import seed_tenants
+
+
+# Endpoints do dashboard considerados caminho quente (acessados como usuário da empresa)
+HOT_PATHS = [
+    '/api/vendedores/',
+    '/api/receitas/',
+    '/api/receitas/?ano={ano}',
+    '/api/receitas/?paginacao=cursor',
+    '/api/receitas/retrospectiva/?ano={ano}',
+    '/api/receitas/comparativo_vendedores/?ano={ano}',
+    '/api/receitas/tendencia/?ano_fim={ano}',
+    '/api/vendas-vendedor/',
+    '/api/vendas-vendedor/?ano={ano}&mes=6',
+    '/api/estrategias/',
+    '/api/estrategias/?ano={ano}',
+    '/api/estrategias/simulacao/?ano={ano}&caminhos=1000',
+    '/api/gestao-semanal/',
+    '/api/gestao-semanal/?ano={ano}&mes=6',
+    '/api/gestao-semanal/?paginacao=cursor',
+    '/api/gestao-semanal/reconciliacao/?ano={ano}',
+    '/api/protocolos/',
+    '/api/dashboard/bundle/?ano={ano}&mes=6',
+]
+
+SORT_NODES = {'Sort', 'Incremental Sort'}
+
+# O prefetch dos investimentos faz IN sobre no máximo dois cenários (<= 24 linhas)
+SORT_ALLOWED = {'dashboard_investimentomensal'}
+
+
+class Command(BaseCommand):
+    help = (
+        'Popula um banco temporário (transação com rollback), executa EXPLAIN com '
+        'as configurações padrão do planner nas queries de cada endpoint do '
+        'dashboard e falha se houver Seq Scan ou Sort sobre tabelas do dashboard'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--companies', type=int, default=200, help='Empresas a semear')
+        parser.add_argument('--anos', type=int, default=3, help='Anos de histórico por empresa')
+        parser.add_argument('--verbose-plans', action='store_true', help='Imprime os planos')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('check_query_plans requer PostgreSQL.')
+
+        with transaction.atomic():
+            seed = seed_tenants(
+                companies=options['companies'], anos=options['anos'], prefix='plano-check'
+            )
+            user, ano = seed.users[0], seed.anos[-1]
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+            falhas = self.check_endpoints(user, ano, options['verbose_plans'])
+            transaction.set_rollback(True)
+
+        if falhas:
+            for falha in falhas:
+                self.stderr.write(falha)
+            raise CommandError(f'{len(falhas)} problema(s) de plano de execução encontrado(s).')
+
+        self.stdout.write(self.style.SUCCESS('Nenhum Seq Scan ou Sort nos caminhos quentes.'))
+
+    def check_endpoints(self, user, ano, verbose):
+        client = APIClient()
+        client.force_authenticate(user)
+        falhas = []
+
+        for path in HOT_PATHS:
+            url = path.format(ano=ano)
+            with override_settings(ALLOWED_HOSTS=['*']):
+                with CaptureQueriesContext(connection) as ctx:
+                    response = client.get(url)
+
+            if response.status_code != 200:
+                falhas.append(f'{url}: status {response.status_code}')
+                continue
+
+            for query in ctx.captured_queries:
+                sql = query['sql']
+                if not sql.lstrip().startswith(('SELECT', 'WITH')) or 'dashboard_' not in sql:
+                    continue
+
+                with connection.cursor() as cursor:
+                    cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}')
+                    plan = cursor.fetchone()[0]
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                plan = plan[0]['Plan']
+
+                if verbose:
+                    self.stdout.write(f'{url}\n  {sql}\n  {json.dumps(plan, indent=2)}')
+
+                for problema in self.inspect_plan(plan):
+                    falhas.append(f'{url}: {problema}\n  {sql}')
+
+        return falhas
+
+    def inspect_plan(self, node):
+        """
+        Percorre o plano procurando Seq Scan em tabelas do dashboard e Sort
+        (sobre scan, join ou agregado) que leia alguma delas
+        """
+        tabela = node.get('Relation Name', '')
+
+        if node['Node Type'] == 'Seq Scan' and tabela.startswith('dashboard_'):
+            yield f'Seq Scan em {tabela}'
+
+        if node['Node Type'] in SORT_NODES:
+            tabelas = self.tabelas(node) - SORT_ALLOWED
+            if tabelas:
+                yield f'{node["Node Type"]} sobre {", ".join(sorted(tabelas))}'
+
+        for child in node.get('Plans', []):
+            yield from self.inspect_plan(child)
+
+    def tabelas(self, node):
+        """Tabelas do dashboard lidas pelo nó e pelos filhos"""
+        tabelas = set()
+        if node.get('Relation Name', '').startswith('dashboard_'):
+            tabelas.add(node['Relation Name'])
+        for child in node.get('Plans', []):
+            tabelas |= self.tabelas(child)
+        return tabelas
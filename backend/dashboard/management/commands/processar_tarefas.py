@@ -0,0 +1,86 @@
+import os
+import signal
+import socket
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connections
+
+from dashboard.tarefas import TAREFAS, executar, recuperar_travadas, reservar
+
+
+class Command(BaseCommand):
+    help = (
+        'Processa a fila de tarefas em segundo plano (dashboard.Tarefa). Cada '
+        'thread reserva uma tarefa por vez com FOR UPDATE SKIP LOCKED e usa a '
+        'própria conexão com o banco; SIGTERM/SIGINT terminam a tarefa atual e saem'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concorrencia', type=int, default=2, help='Tarefas em paralelo (threads)')
+        parser.add_argument('--intervalo', type=float, default=2.0, help='Espera com a fila vazia (segundos)')
+        parser.add_argument('--tipo', action='append', choices=sorted(TAREFAS), help='Processa só esses tipos')
+        parser.add_argument('--uma-vez', action='store_true', help='Esvazia a fila e sai')
+
+    def handle(self, *args, **options):
+        parar = threading.Event()
+        for sinal in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(sinal, lambda *_: parar.set())
+
+        reenfileiradas, falhas = recuperar_travadas()
+        if reenfileiradas or falhas:
+            self.stdout.write(f'{reenfileiradas} tarefa(s) travada(s) de volta à fila, {falhas} falha(s).')
+
+        prefixo = f'{socket.gethostname()}:{os.getpid()}'
+        threads = [
+            threading.Thread(
+                target=self.processar,
+                args=(f'{prefixo}:{i}', options, parar, i == 0),
+                name=f'tarefas-{i}'
+            )
+            for i in range(max(options['concorrencia'], 1))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.stdout.write(self.style.SUCCESS('Worker encerrado.'))
+
+    def processar(self, worker, options, parar, recupera):
+        processadas = 0
+        try:
+            while not parar.is_set():
+                try:
+                    tarefa = reservar(worker, options['tipo'])
+                except DatabaseError as exc:
+                    # Banco indisponível ou conexão caída: reconecta na próxima volta
+                    self.stderr.write(f'{worker}: erro ao reservar tarefa ({exc}).')
+                    connections.close_all()
+                    parar.wait(options['intervalo'])
+                    continue
+
+                if tarefa is None:
+                    if options['uma_vez']:
+                        break
+                    # Uma thread por worker devolve à fila tarefas de workers que morreram
+                    if recupera:
+                        recuperar_travadas()
+                    parar.wait(options['intervalo'])
+                    continue
+
+                try:
+                    executar(tarefa)
+                except Exception as exc:
+                    # Falha ao gravar o resultado: a tarefa fica 'executando' até
+                    # recuperar_travadas e a thread segue com a fila
+                    self.stderr.write(f'{worker}: erro ao executar a tarefa {tarefa.pk} ({exc!r}).')
+                    connections.close_all()
+                    parar.wait(options['intervalo'])
+                    continue
+                processadas += 1
+        finally:
+            # Conexões são por thread: fecha a desta antes de sair
+            connections.close_all()
+
+        self.stdout.write(f'{worker}: {processadas} tarefa(s) processada(s).')
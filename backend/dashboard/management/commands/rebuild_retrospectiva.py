@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from dashboard.models import RetrospectivaAnual
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói o consolidado anual (RetrospectivaAnual) a partir das receitas mensais'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--company', help='ID da empresa (padrão: todas)')
+        parser.add_argument('--ano', type=int, help='Ano (padrão: todos)')
+    
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            total = RetrospectivaAnual.objects.reconstruir(
+                company_id=options['company'],
+                ano=options['ano']
+            )
+        
+        self.stdout.write(self.style.SUCCESS(f'{total} consolidado(s) recalculado(s).'))
@@ -0,0 +1,71 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+
+from core.models import Company
+from dashboard.models import (
+    GestaoSemanal, ReceitaMensal, RECONCILIACAO_TOLERANCIA, resumir_reconciliacao
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Reconcilia a gestão semanal (soma por mês) com a receita mensal de uma '
+        'ou de todas as empresas em uma única query'
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--company', help='ID da empresa (padrão: todas)')
+        parser.add_argument('--ano', type=int, help='Ano (padrão: todos)')
+        parser.add_argument('--mes', type=int, help='Mês (padrão: todos)')
+        parser.add_argument(
+            '--tolerancia', default=str(RECONCILIACAO_TOLERANCIA),
+            help='Diferença percentual aceita (padrão: %(default)s)'
+        )
+        parser.add_argument('--output', help='Grava os meses não conciliados em JSON')
+        parser.add_argument(
+            '--fail-on-divergence', action='store_true',
+            help='Sai com erro se houver meses divergentes'
+        )
+    
+    def handle(self, *args, **options):
+        filtros = {
+            campo: options[campo]
+            for campo in ('ano', 'mes') if options[campo] is not None
+        }
+        if options['company']:
+            filtros['company_id'] = options['company']
+        
+        meses = GestaoSemanal.objects.filter(**filtros).reconciliar(
+            ReceitaMensal.objects.filter(**filtros),
+            options['tolerancia']
+        )
+        pendentes = [item for item in meses if item['status'] != 'ok']
+        
+        nomes = dict(
+            Company.objects.filter(
+                pk__in={item['company_id'] for item in pendentes}
+            ).values_list('pk', 'name')
+        )
+        for item in pendentes:
+            item['company'] = nomes.get(item['company_id'])
+            self.stdout.write(
+                f"{item['company']} {item['mes']:02d}/{item['ano']}: {item['status']} "
+                f"(receita {item['receita']['variacao']}%, "
+                f"investimento {item['investimento']['variacao']}%, "
+                f"leads {item['leads']['variacao']}%)"
+            )
+        
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(pendentes, f, cls=DjangoJSONEncoder, indent=2)
+        
+        resumo = resumir_reconciliacao(meses)
+        self.stdout.write(self.style.SUCCESS(
+            f"{resumo['meses']} mês(es): {resumo['ok']} ok, {resumo['divergente']} divergente(s), "
+            f"{resumo['sem_semanal']} sem semanal, {resumo['sem_mensal']} sem mensal."
+        ))
+        
+        if options['fail_on_divergence'] and resumo['divergente']:
+            raise CommandError(f"{resumo['divergente']} mês(es) divergente(s).")
@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from dashboard.seed import SENHA_PADRAO, seed_tenants
+
+
+class Command(BaseCommand):
+    help = 'Gera empresas sintéticas com histórico completo do dashboard (bulk inserts, semente fixa)'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--companies', type=int, default=10, help='Quantidade de empresas')
+        parser.add_argument('--vendedores', type=int, default=8, help='Vendedores por empresa')
+        parser.add_argument('--anos', type=int, default=3, help='Anos de histórico')
+        parser.add_argument('--ano-final', type=int, default=2025, help='Último ano do histórico')
+        parser.add_argument('--seed', type=int, default=42, help='Semente do gerador')
+        parser.add_argument('--prefix', default='seed', help='Prefixo do slug das empresas')
+        parser.add_argument('--senha', default=SENHA_PADRAO, help='Senha dos usuários admin@<slug>.local')
+    
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        result = seed_tenants(
+            companies=options['companies'],
+            vendedores=options['vendedores'],
+            anos=options['anos'],
+            ano_final=options['ano_final'],
+            seed=options['seed'],
+            prefix=options['prefix'],
+            senha=options['senha']
+        )
+        duracao = time.perf_counter() - inicio
+        
+        for tabela, total in result.linhas.items():
+            self.stdout.write(f'  {tabela}: {total}')
+        self.stdout.write(self.style.SUCCESS(f'Seed concluído em {duracao:.1f}s.'))
@@ -1,6 +1,9 @@
-from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, models, transaction
+from django.utils import timezone
 from django.core.validators import MinValueValidator
-from core.models import Company
+from core.models import Company, User
+from decimal import Decimal
 import uuid
 
 
@@ -14,6 +17,50 @@ class BaseModel(models.Model):
         abstract = True
 
 
+class CompanyDataQuerySet(models.QuerySet):
+    """
+    QuerySet que incrementa a data_version das empresas nos caminhos em massa
+    (bulk_create, bulk_update e update), que não disparam o post_save usado
+    para invalidar o cache. O delete() em massa já passa pelo post_delete.
+    """
+    # Caminho até a empresa a partir do modelo
+    company_field = 'company'
+    
+    def _companies(self):
+        return set(self.order_by().values_list(self.company_field, flat=True).distinct())
+    
+    def _companies_de(self, objs):
+        return {obj.company_id for obj in objs}
+    
+    def _altera_company(self, fields):
+        relacao = self.company_field.split('__')[0]
+        return bool({relacao, f'{relacao}_id'} & set(fields))
+    
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        Company.objects.bump_data_version(*self._companies_de(objs))
+        return objs
+    
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        companies = self._companies_de(objs)
+        if self._altera_company(fields):
+            # Empresas antigas também precisam ser invalidadas
+            companies |= self.model.objects.filter(pk__in=[obj.pk for obj in objs])._companies()
+        rows = super().bulk_update(objs, fields, *args, **kwargs)
+        Company.objects.bump_data_version(*companies)
+        return rows
+    
+    def update(self, **kwargs):
+        pks = list(self.values_list('pk', flat=True))
+        companies = self._companies()
+        rows = super().update(**kwargs)
+        if self._altera_company(kwargs):
+            companies |= self.model.objects.filter(pk__in=pks)._companies()
+        Company.objects.bump_data_version(*companies)
+        return rows
+
+
 class Vendedor(BaseModel):
     """Vendedores da empresa"""
     company = models.ForeignKey(
@@ -26,16 +73,180 @@ class Vendedor(BaseModel):
     email = models.EmailField('Email', blank=True)
     is_active = models.BooleanField('Ativo', default=True)
     
+    objects = CompanyDataQuerySet.as_manager()
+    
     class Meta:
         verbose_name = 'Vendedor'
         verbose_name_plural = 'Vendedores'
         ordering = ['nome']
         unique_together = ['company', 'email']
+        indexes = [
+            # Listagem por empresa já ordenada por nome
+            models.Index(fields=['company', 'nome'], name='vendedor_company_nome_idx'),
+        ]
     
     def __str__(self):
         return self.nome
 
 
+# Janelas sobre a série mensal já agregada (CTE "mensal"): mesmo mês do ano
+# anterior, somas móveis por calendário (ano * 12 + mes, então meses sem dados
+# não deslocam a janela) e acumulado do ano
+TENDENCIA_SQL = """
+WITH mensal AS ({mensal})
+SELECT
+    ano, mes, receita_mes, investimento_mes, leads_mes,
+    LAG(ano) OVER anual,
+    LAG(receita_mes) OVER anual,
+    LAG(investimento_mes) OVER anual,
+    LAG(leads_mes) OVER anual,
+    SUM(receita_mes) OVER movel_3m,
+    SUM(investimento_mes) OVER movel_3m,
+    SUM(leads_mes) OVER movel_3m,
+    SUM(receita_mes) OVER movel_12m,
+    SUM(investimento_mes) OVER movel_12m,
+    SUM(leads_mes) OVER movel_12m,
+    SUM(receita_mes) OVER acumulado_ano,
+    SUM(investimento_mes) OVER acumulado_ano,
+    SUM(leads_mes) OVER acumulado_ano
+FROM mensal
+WINDOW
+    anual AS (PARTITION BY mes ORDER BY ano),
+    movel_3m AS (ORDER BY ano * 12 + mes RANGE BETWEEN 2 PRECEDING AND CURRENT ROW),
+    movel_12m AS (ORDER BY ano * 12 + mes RANGE BETWEEN 11 PRECEDING AND CURRENT ROW),
+    acumulado_ano AS (PARTITION BY ano ORDER BY mes)
+ORDER BY ano, mes
+"""
+
+
+def _decimal(valor):
+    return Decimal(str(valor or 0)).quantize(Decimal('0.01'))
+
+
+def _roas(receita, investimento):
+    return round(float(receita / investimento), 2) if investimento else 0
+
+
+def calcular_roas(retorno, investimento):
+    """ROAS sem arredondamento (propriedades `roas` e leitura rápida das listagens)"""
+    if investimento and investimento > 0:
+        return float(retorno / investimento)
+    return 0
+
+
+def _variacao(atual, anterior):
+    """Variação percentual (None sem base de comparação)"""
+    if not anterior:
+        return None
+    # + 0.0 evita "-0.0" em diferenças que arredondam para zero
+    return round(float((atual - anterior) / anterior * 100), 2) + 0.0
+
+
+def _totais(receita, investimento, leads):
+    receita, investimento = _decimal(receita), _decimal(investimento)
+    return {
+        'receita': receita,
+        'investimento': investimento,
+        'leads': int(leads or 0),
+        'roas': _roas(receita, investimento),
+    }
+
+
+class ReceitaMensalQuerySet(models.QuerySet):
+    """
+    QuerySet que mantém a RetrospectivaAnual sincronizada nos caminhos em
+    massa (bulk_create, bulk_update, update e delete), que não passam por
+    save()/delete() do modelo.
+    """
+    
+    def _chaves(self):
+        return set(self.order_by().values_list('company_id', 'ano').distinct())
+    
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        chaves = {(obj.company_id, obj.ano) for obj in objs}
+        RetrospectivaAnual.objects.recalcular_chaves(chaves)
+        Company.objects.bump_data_version(*{company_id for company_id, _ in chaves})
+        return objs
+    
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        chaves = {(obj.company_id, obj.ano) for obj in objs}
+        if {'company', 'ano'} & set(fields):
+            # Chaves antigas também precisam ser recalculadas
+            chaves |= self.model.objects.filter(
+                pk__in=[obj.pk for obj in objs]
+            )._chaves()
+        rows = super().bulk_update(objs, fields, *args, **kwargs)
+        RetrospectivaAnual.objects.recalcular_chaves(chaves)
+        Company.objects.bump_data_version(*{company_id for company_id, _ in chaves})
+        return rows
+    
+    def update(self, **kwargs):
+        pks = list(self.values_list('pk', flat=True))
+        chaves = self._chaves()
+        rows = super().update(**kwargs)
+        if {'company', 'company_id', 'ano'} & set(kwargs):
+            chaves |= self.model.objects.filter(pk__in=pks)._chaves()
+        RetrospectivaAnual.objects.recalcular_chaves(chaves)
+        Company.objects.bump_data_version(*{company_id for company_id, _ in chaves})
+        return rows
+    
+    def delete(self):
+        chaves = self._chaves()
+        result = super().delete()
+        RetrospectivaAnual.objects.recalcular_chaves(chaves)
+        Company.objects.bump_data_version(*{company_id for company_id, _ in chaves})
+        return result
+    
+    def tendencia(self, ano_inicio, ano_fim):
+        """
+        Série mensal de ano_inicio a ano_fim (somando as empresas do queryset)
+        com comparação ao ano anterior, somas móveis de 3 e 12 meses e
+        acumulado do ano, tudo em uma única query com funções de janela.
+        """
+        # O ano anterior ao início alimenta as janelas do primeiro ano
+        mensal = self.filter(
+            ano__gte=ano_inicio - 1, ano__lte=ano_fim
+        ).order_by().values('ano', 'mes').annotate(
+            receita_mes=models.Sum('receita'),
+            investimento_mes=models.Sum('investimento'),
+            leads_mes=models.Sum('leads'),
+        )
+        sql, params = mensal.query.sql_with_params()
+        with connections[self.db].cursor() as cursor:
+            cursor.execute(TENDENCIA_SQL.format(mensal=sql), params)
+            linhas = cursor.fetchall()
+        
+        meses = dict(self.model.Mes.choices)
+        serie = []
+        for linha in linhas:
+            ano, mes, receita, investimento, leads, ano_anterior = linha[:6]
+            if ano < ano_inicio:
+                continue
+            
+            item = {'ano': ano, 'mes': mes, 'mes_nome': meses.get(mes)}
+            item.update(_totais(receita, investimento, leads))
+            
+            # Só compara com o mesmo mês do ano imediatamente anterior
+            item['ano_anterior'] = None
+            if ano_anterior == ano - 1:
+                anterior = _totais(*linha[6:9])
+                anterior.update({
+                    'variacao_receita': _variacao(item['receita'], anterior['receita']),
+                    'variacao_investimento': _variacao(item['investimento'], anterior['investimento']),
+                    'variacao_leads': _variacao(item['leads'], anterior['leads']),
+                })
+                item['ano_anterior'] = anterior
+            
+            item['movel_3m'] = _totais(*linha[9:12])
+            item['movel_12m'] = _totais(*linha[12:15])
+            item['acumulado_ano'] = _totais(*linha[15:18])
+            serie.append(item)
+        
+        return serie
+
+
 class ReceitaMensal(BaseModel):
     """Receita mensal da empresa"""
     
@@ -76,21 +287,209 @@ class ReceitaMensal(BaseModel):
     )
     leads = models.PositiveIntegerField('Leads', default=0)
     
+    objects = ReceitaMensalQuerySet.as_manager()
+    
     class Meta:
         verbose_name = 'Receita Mensal'
         verbose_name_plural = 'Receitas Mensais'
         ordering = ['-ano', '-mes']
-        unique_together = ['company', 'ano', 'mes']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['company', 'ano', 'mes'],
+                name='receita_company_periodo_uniq'
+            ),
+        ]
+        indexes = [
+            # Cobre os agregados por (company, ano) sem ler a tabela
+            models.Index(
+                fields=['company', 'ano', 'mes'],
+                include=['receita', 'investimento', 'leads'],
+                name='receita_company_periodo_idx'
+            ),
+            # Todas as empresas (platform admin) e paginação por cursor
+            models.Index(fields=['-ano', '-mes', '-id'], name='receita_periodo_idx'),
+        ]
     
     def __str__(self):
         return f"{self.company.name} - {self.get_mes_display()}/{self.ano}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Guarda a chave carregada para recalcular o ano antigo se ela mudar
+        instance._chave_original = (
+            instance.__dict__.get('company_id'), instance.__dict__.get('ano')
+        )
+        return instance
+    
+    def save(self, *args, **kwargs):
+        chaves = {(self.company_id, self.ano)}
+        chave_original = getattr(self, '_chave_original', None)
+        if chave_original and None not in chave_original:
+            chaves.add(chave_original)
+        # O post_save incrementa a data_version: ela só fica visível junto
+        # com o consolidado recalculado, senão uma leitura concorrente
+        # cachearia o consolidado antigo sob a versão nova
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            RetrospectivaAnual.objects.recalcular_chaves(chaves)
+        self._chave_original = (self.company_id, self.ano)
+    
+    def delete(self, *args, **kwargs):
+        chave = (self.company_id, self.ano)
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            RetrospectivaAnual.objects.recalcular_chaves({chave})
+        return result
+    
     @property
     def roas(self):
         """Calcula ROAS (Return on Ad Spend)"""
-        if self.investimento and self.investimento > 0:
-            return float(self.receita / self.investimento)
-        return 0
+        return calcular_roas(self.receita, self.investimento)
+
+
+class RetrospectivaAnualManager(models.Manager):
+    """Manager com o recálculo incremental do consolidado anual"""
+    
+    def recalcular(self, company_id, ano):
+        """Recalcula o consolidado de (company, ano) a partir das receitas"""
+        self.recalcular_chaves({(company_id, ano)})
+    
+    def recalcular_chaves(self, chaves, lote=500):
+        """
+        Recalcula um conjunto de pares (company_id, ano) de forma agrupada:
+        uma leitura das receitas e um upsert por lote de empresas.
+        """
+        chaves = {
+            (uuid.UUID(str(company_id)), int(ano))
+            for company_id, ano in chaves
+            if company_id is not None and ano is not None
+        }
+        companies = sorted({company_id for company_id, _ in chaves})
+        
+        for i in range(0, len(companies), lote):
+            grupo = set(companies[i:i + lote])
+            self._recalcular_lote({chave for chave in chaves if chave[0] in grupo})
+    
+    def _recalcular_lote(self, chaves):
+        company_ids = {company_id for company_id, _ in chaves}
+        with transaction.atomic():
+            # Trava as empresas (sempre na mesma ordem) antes de ler as receitas:
+            # recálculos concorrentes da mesma chave leem e gravam um de cada vez,
+            # sem que o upsert mais lento sobrescreva o total com dados antigos
+            list(
+                Company.objects.select_for_update()
+                .filter(pk__in=company_ids)
+                .order_by('pk')
+                .values_list('pk', flat=True)
+            )
+            meses_por_chave = {chave: [] for chave in chaves}
+            linhas = (
+                ReceitaMensal.objects
+                .filter(
+                    company_id__in=company_ids,
+                    ano__in={ano for _, ano in chaves}
+                )
+                .order_by('company_id', 'ano', 'mes')
+                .values_list('company_id', 'ano', 'mes', 'receita', 'investimento', 'leads')
+            )
+            for company_id, ano, *mes in linhas:
+                if (company_id, ano) in meses_por_chave:
+                    meses_por_chave[(company_id, ano)].append(mes)
+            
+            consolidados, vazias = [], models.Q(pk__in=[])
+            for (company_id, ano), meses in meses_por_chave.items():
+                if not meses:
+                    vazias |= models.Q(company_id=company_id, ano=ano)
+                    continue
+            
+                receita_total = sum(m[1] for m in meses)
+                investimento_total = sum(m[2] for m in meses)
+                roas_global = 0
+                if investimento_total > 0:
+                    roas_global = float(receita_total / investimento_total)
+            
+                # Em caso de empate, o primeiro mês com a maior receita
+                pico = max(meses, key=lambda m: m[1])
+            
+                consolidados.append(self.model(
+                    company_id=company_id,
+                    ano=ano,
+                    receita_total=receita_total,
+                    investimento_total=investimento_total,
+                    leads_total=sum(m[3] for m in meses),
+                    roas_global=roas_global,
+                    mes_pico=pico[0],
+                    receita_pico=pico[1],
+                ))
+            
+            self.filter(vazias).delete()
+            self.bulk_create(
+                consolidados,
+                update_conflicts=True,
+                unique_fields=['company', 'ano'],
+                update_fields=[
+                    'receita_total', 'investimento_total', 'leads_total',
+                    'roas_global', 'mes_pico', 'receita_pico', 'updated_at'
+                ]
+            )
+    
+    def reconstruir(self, company_id=None, ano=None):
+        """Reconstrói o consolidado do zero, opcionalmente filtrado"""
+        receitas = ReceitaMensal.objects.all()
+        existentes = self.all()
+        if company_id:
+            receitas = receitas.filter(company_id=company_id)
+            existentes = existentes.filter(company_id=company_id)
+        if ano:
+            receitas = receitas.filter(ano=ano)
+            existentes = existentes.filter(ano=ano)
+        
+        chaves = receitas._chaves() | set(existentes.values_list('company_id', 'ano'))
+        self.recalcular_chaves(chaves)
+        return len(chaves)
+
+
+class RetrospectivaAnual(BaseModel):
+    """
+    Consolidado anual da receita por empresa. Mantido incrementalmente a cada
+    escrita em ReceitaMensal e usado pelo endpoint de retrospectiva.
+    """
+    company = models.ForeignKey(
+        Company,
+        on_delete=models.CASCADE,
+        related_name='retrospectivas_anuais',
+        verbose_name='Empresa'
+    )
+    ano = models.PositiveIntegerField('Ano')
+    receita_total = models.DecimalField('Receita Total', max_digits=14, decimal_places=2, default=0)
+    investimento_total = models.DecimalField('Investimento Total', max_digits=14, decimal_places=2, default=0)
+    leads_total = models.PositiveIntegerField('Leads Total', default=0)
+    roas_global = models.FloatField('ROAS Global', default=0)
+    mes_pico = models.PositiveSmallIntegerField(
+        'Mês de Pico',
+        choices=ReceitaMensal.Mes.choices,
+        null=True,
+        blank=True
+    )
+    receita_pico = models.DecimalField(
+        'Receita do Mês de Pico',
+        max_digits=12,
+        decimal_places=2,
+        null=True,
+        blank=True
+    )
+    
+    objects = RetrospectivaAnualManager()
+    
+    class Meta:
+        verbose_name = 'Retrospectiva Anual'
+        verbose_name_plural = 'Retrospectivas Anuais'
+        ordering = ['-ano']
+        unique_together = ['company', 'ano']
+    
+    def __str__(self):
+        return f"{self.company.name} - {self.ano}"
 
 
 class VendaVendedor(BaseModel):
@@ -116,11 +515,29 @@ class VendaVendedor(BaseModel):
         validators=[MinValueValidator(0)]
     )
     
+    objects = CompanyDataQuerySet.as_manager()
+    
     class Meta:
         verbose_name = 'Venda por Vendedor'
         verbose_name_plural = 'Vendas por Vendedor'
         ordering = ['-ano', '-mes', 'vendedor__nome']
         unique_together = ['company', 'vendedor', 'ano', 'mes']
+        indexes = [
+            # Listagem por empresa e comparativo_vendedores (company, ano)
+            models.Index(
+                fields=['company', 'ano', 'mes'],
+                include=['vendedor', 'valor'],
+                name='venda_company_periodo_idx'
+            ),
+            # Total de vendas por vendedor com janela de ano/mês
+            models.Index(
+                fields=['vendedor', 'ano', 'mes'],
+                include=['valor'],
+                name='venda_vendedor_periodo_idx'
+            ),
+            # Todas as empresas (platform admin) e paginação por cursor
+            models.Index(fields=['-ano', '-mes', '-id'], name='venda_periodo_idx'),
+        ]
     
     def __str__(self):
         return f"{self.vendedor.nome} - {self.get_mes_display()}/{self.ano}"
@@ -166,16 +583,71 @@ class Estrategia(BaseModel):
         help_text='Se ROAS < este valor, congelar investimento'
     )
     
+    objects = CompanyDataQuerySet.as_manager()
+    
     class Meta:
         verbose_name = 'Estratégia'
         verbose_name_plural = 'Estratégias'
         ordering = ['-ano']
         unique_together = ['company', 'ano', 'cenario']
+        indexes = [
+            # O unique_together já atende (company, ano); este cobre o
+            # filtro por cenário da empresa ordenado por ano
+            models.Index(fields=['company', 'cenario', 'ano'], name='estrategia_company_cen_idx'),
+            # Listagem de todas as empresas (platform admin)
+            models.Index(fields=['-ano', 'id'], name='estrategia_ano_idx'),
+        ]
     
     def __str__(self):
         return f"{self.company.name} - {self.ano} ({self.get_cenario_display()})"
 
 
+class InvestimentoMensalQuerySet(CompanyDataQuerySet):
+    company_field = 'estrategia__company'
+    
+    def _companies_de(self, objs):
+        return set(Estrategia.objects.filter(
+            pk__in={obj.estrategia_id for obj in objs}
+        ).values_list('company_id', flat=True))
+
+
+class InvestimentoMensalManager(models.Manager.from_queryset(InvestimentoMensalQuerySet)):
+    """Manager com a gravação do plano mensal por diferença"""
+    
+    def sincronizar(self, estrategia, investimentos):
+        """
+        Substitui o plano mensal da estratégia em uma única transação,
+        gravando apenas o que mudou. `investimentos` é uma lista de dicts
+        já validados com `mes` e `valor`.
+        """
+        with transaction.atomic():
+            # Saves concorrentes da mesma estratégia leem e gravam um de cada vez
+            Estrategia.objects.select_for_update().get(pk=estrategia.pk)
+            atuais = {inv.mes: inv for inv in self.filter(estrategia=estrategia)}
+            novos = {inv['mes']: inv['valor'] for inv in investimentos}
+            agora = timezone.now()
+            
+            criar, atualizar = [], []
+            for mes, valor in novos.items():
+                atual = atuais.get(mes)
+                if atual is None:
+                    criar.append(self.model(estrategia=estrategia, mes=mes, valor=valor))
+                elif atual.valor != valor:
+                    atual.valor = valor
+                    atual.updated_at = agora
+                    atualizar.append(atual)
+            remover = [inv.pk for mes, inv in atuais.items() if mes not in novos]
+            
+            if remover:
+                self.filter(pk__in=remover).delete()
+            if atualizar:
+                self.bulk_update(atualizar, ['valor', 'updated_at'])
+            if criar:
+                self.bulk_create(criar)
+        
+        return {'criados': len(criar), 'atualizados': len(atualizar), 'removidos': len(remover)}
+
+
 class InvestimentoMensal(BaseModel):
     """Investimento mensal planejado na estratégia"""
     estrategia = models.ForeignKey(
@@ -192,6 +664,8 @@ class InvestimentoMensal(BaseModel):
         validators=[MinValueValidator(0)]
     )
     
+    objects = InvestimentoMensalManager()
+    
     class Meta:
         verbose_name = 'Investimento Mensal'
         verbose_name_plural = 'Investimentos Mensais'
@@ -202,6 +676,116 @@ class InvestimentoMensal(BaseModel):
         return f"{self.estrategia} - {self.get_mes_display()}"
 
 
+# Semanal agregado por mês x ReceitaMensal, nos dois sentidos (FULL OUTER JOIN:
+# meses com só um dos lados também aparecem)
+RECONCILIACAO_SQL = """
+WITH semanal AS ({semanal}), mensal AS ({mensal})
+SELECT
+    COALESCE(s.company_id, m.company_id),
+    COALESCE(s.ano, m.ano),
+    COALESCE(s.mes, m.mes),
+    s.semanas,
+    s.investimento_semanal, m.investimento,
+    s.leads_semanal, m.leads,
+    s.vendas_semanal, m.receita
+FROM semanal s
+FULL OUTER JOIN mensal m
+    ON m.company_id = s.company_id AND m.ano = s.ano AND m.mes = s.mes
+ORDER BY 1, 2, 3
+"""
+
+# Diferença percentual aceita entre semanal e mensal
+RECONCILIACAO_TOLERANCIA = Decimal('1.0')
+RECONCILIACAO_STATUS = ('ok', 'divergente', 'sem_semanal', 'sem_mensal')
+
+
+def _diferenca(semanal, mensal, tolerancia):
+    """Compara um indicador; retorna o detalhe e se está dentro da tolerância"""
+    diferenca = semanal - mensal
+    variacao = _variacao(semanal, mensal)
+    if mensal:
+        confere = abs(diferenca) * 100 <= abs(mensal) * tolerancia
+    else:
+        confere = not diferenca
+    return {
+        'semanal': semanal,
+        'mensal': mensal,
+        'diferenca': diferenca,
+        'variacao': variacao,
+    }, confere
+
+
+def resumir_reconciliacao(meses):
+    """Contagem de meses por status"""
+    resumo = dict.fromkeys(RECONCILIACAO_STATUS, 0)
+    for item in meses:
+        resumo[item['status']] += 1
+    resumo['meses'] = len(meses)
+    return resumo
+
+
+class GestaoSemanalQuerySet(CompanyDataQuerySet):
+    
+    def reconciliar(self, receitas, tolerancia=RECONCILIACAO_TOLERANCIA):
+        """
+        Compara, por (empresa, ano, mês), a soma semanal de investimento,
+        leads e vendas com a ReceitaMensal (investimento, leads e receita).
+        `receitas` é o queryset de ReceitaMensal com os mesmos filtros; a
+        agregação e o join rodam em uma única query.
+        """
+        chave = ('company_id', 'ano', 'mes')
+        semanal = self.order_by().values(*chave).annotate(
+            semanas=models.Count('id'),
+            investimento_semanal=models.Sum('investimento'),
+            leads_semanal=models.Sum('leads'),
+            vendas_semanal=models.Sum('vendas'),
+        )
+        mensal = receitas.order_by().values(*chave, 'receita', 'investimento', 'leads')
+        
+        sql_semanal, params_semanal = semanal.query.sql_with_params()
+        sql_mensal, params_mensal = mensal.query.sql_with_params()
+        with connections[self.db].cursor() as cursor:
+            cursor.execute(
+                RECONCILIACAO_SQL.format(semanal=sql_semanal, mensal=sql_mensal),
+                (*params_semanal, *params_mensal)
+            )
+            linhas = cursor.fetchall()
+        
+        tolerancia = Decimal(str(tolerancia))
+        meses = dict(ReceitaMensal.Mes.choices)
+        resultado = []
+        for (company_id, ano, mes, semanas, investimento_semanal, investimento,
+             leads_semanal, leads, vendas_semanal, receita) in linhas:
+            item = {
+                'company_id': uuid.UUID(str(company_id)),
+                'ano': ano,
+                'mes': mes,
+                'mes_nome': meses.get(mes),
+                'semanas': semanas or 0,
+            }
+            item['investimento'], investimento_ok = _diferenca(
+                _decimal(investimento_semanal), _decimal(investimento), tolerancia
+            )
+            item['leads'], leads_ok = _diferenca(
+                int(leads_semanal or 0), int(leads or 0), tolerancia
+            )
+            item['receita'], receita_ok = _diferenca(
+                _decimal(vendas_semanal), _decimal(receita), tolerancia
+            )
+            
+            if semanas is None:
+                item['status'] = 'sem_semanal'
+            elif receita is None:
+                item['status'] = 'sem_mensal'
+            elif investimento_ok and leads_ok and receita_ok:
+                item['status'] = 'ok'
+            else:
+                item['status'] = 'divergente'
+            resultado.append(item)
+        
+        return resultado
+
+
 class GestaoSemanal(BaseModel):
     """Registro semanal de métricas"""
     company = models.ForeignKey(
@@ -233,20 +817,35 @@ class GestaoSemanal(BaseModel):
         validators=[MinValueValidator(0)]
     )
     
+    objects = GestaoSemanalQuerySet.as_manager()
+    
     class Meta:
         verbose_name = 'Gestão Semanal'
         verbose_name_plural = 'Gestões Semanais'
         ordering = ['-ano', '-mes', '-semana']
-        unique_together = ['company', 'ano', 'mes', 'semana']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['company', 'ano', 'mes', 'semana'],
+                name='gestao_company_periodo_uniq'
+            ),
+        ]
+        indexes = [
+            # Cobre os agregados semanais por (company, ano, mes)
+            models.Index(
+                fields=['company', 'ano', 'mes', 'semana'],
+                include=['investimento', 'leads', 'vendas'],
+                name='gestao_company_periodo_idx'
+            ),
+            # Todas as empresas (platform admin) e paginação por cursor
+            models.Index(fields=['-ano', '-mes', '-semana', '-id'], name='gestao_periodo_idx'),
+        ]
     
     def __str__(self):
         return f"{self.company.name} - {self.get_mes_display()}/{self.ano} - Semana {self.semana}"
     
     @property
     def roas(self):
-        if self.investimento and self.investimento > 0:
-            return float(self.vendas / self.investimento)
-        return 0
+        return calcular_roas(self.vendas, self.investimento)
 
 
 class Protocolo(BaseModel):
@@ -271,10 +870,148 @@ class Protocolo(BaseModel):
     cor = models.CharField('Cor', max_length=20, default='orange')
     ordem = models.PositiveSmallIntegerField('Ordem', default=0)
     
+    objects = CompanyDataQuerySet.as_manager()
+    
     class Meta:
         verbose_name = 'Protocolo'
         verbose_name_plural = 'Protocolos'
         ordering = ['ordem', 'tipo']
+        indexes = [
+            models.Index(fields=['company', 'ordem', 'tipo'], name='protocolo_company_ordem_idx'),
+        ]
     
     def __str__(self):
         return f"{self.company.name} - {self.titulo}"
+
+
+class AlertaRoas(BaseModel):
+    """
+    Semana atual ou mês até a data com ROAS (GestaoSemanal) abaixo do
+    roas_minimo da estratégia do ano. Gerado pelo comando avaliar_alertas_roas.
+    """
+    
+    class Periodo(models.TextChoices):
+        SEMANA = 'semana', 'Semana atual'
+        MES = 'mes', 'Mês até a data'
+    
+    company = models.ForeignKey(
+        Company,
+        on_delete=models.CASCADE,
+        related_name='alertas_roas',
+        verbose_name='Empresa'
+    )
+    estrategia = models.ForeignKey(
+        Estrategia,
+        on_delete=models.CASCADE,
+        related_name='alertas_roas',
+        verbose_name='Estratégia'
+    )
+    ano = models.PositiveIntegerField('Ano')
+    mes = models.PositiveSmallIntegerField('Mês', choices=ReceitaMensal.Mes.choices)
+    semana = models.PositiveSmallIntegerField('Semana', null=True, blank=True)
+    periodo = models.CharField('Período', max_length=10, choices=Periodo.choices)
+    investimento = models.DecimalField('Investimento', max_digits=14, decimal_places=2)
+    vendas = models.DecimalField('Vendas', max_digits=14, decimal_places=2)
+    roas = models.FloatField('ROAS')
+    roas_minimo = models.DecimalField('ROAS Mínimo', max_digits=5, decimal_places=2)
+    
+    class Meta:
+        verbose_name = 'Alerta de ROAS'
+        verbose_name_plural = 'Alertas de ROAS'
+        ordering = ['-ano', '-mes', 'periodo']
+        indexes = [
+            models.Index(fields=['company', 'ano', 'mes'], name='alerta_company_periodo_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_periodo_display()} {self.mes:02d}/{self.ano} - ROAS {self.roas:.2f}"
+
+
+class AvaliacaoRoas(models.Model):
+    """
+    Última avaliação de alertas por empresa. Se a versão dos dados e o mês de
+    referência não mudaram desde então, a empresa é pulada na próxima execução.
+    """
+    company = models.OneToOneField(
+        Company,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='avaliacao_roas',
+        verbose_name='Empresa'
+    )
+    data_version = models.PositiveBigIntegerField('Versão dos Dados Avaliada')
+    ano = models.PositiveIntegerField('Ano')
+    mes = models.PositiveSmallIntegerField('Mês', choices=ReceitaMensal.Mes.choices)
+    avaliado_em = models.DateTimeField('Avaliado em', auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Avaliação de ROAS'
+        verbose_name_plural = 'Avaliações de ROAS'
+    
+    def __str__(self):
+        return f"{self.company_id} - {self.mes:02d}/{self.ano}"
+
+
+class Tarefa(BaseModel):
+    """
+    Tarefa em segundo plano guardada no banco (fila sem broker). O comando
+    processar_tarefas reserva as pendentes com SELECT ... FOR UPDATE SKIP
+    LOCKED, então vários workers consomem a fila sem pegar a mesma tarefa.
+    """
+    class Status(models.TextChoices):
+        PENDENTE = 'pendente', 'Pendente'
+        EXECUTANDO = 'executando', 'Executando'
+        CONCLUIDA = 'concluida', 'Concluída'
+        FALHOU = 'falhou', 'Falhou'
+    
+    ATIVAS = [Status.PENDENTE, Status.EXECUTANDO]
+    
+    company = models.ForeignKey(
+        Company,
+        on_delete=models.CASCADE,
+        related_name='tarefas',
+        verbose_name='Empresa',
+        null=True,
+        blank=True
+    )
+    tipo = models.CharField('Tipo', max_length=50)
+    parametros = models.JSONField('Parâmetros', default=dict, blank=True)
+    status = models.CharField('Status', max_length=12, choices=Status.choices, default=Status.PENDENTE)
+    chave = models.CharField('Chave de Deduplicação', max_length=200, null=True, blank=True)
+    tentativas = models.PositiveSmallIntegerField('Tentativas', default=0)
+    max_tentativas = models.PositiveSmallIntegerField('Máximo de Tentativas', default=3)
+    executar_em = models.DateTimeField('Executar em', default=timezone.now)
+    iniciada_em = models.DateTimeField('Iniciada em', null=True, blank=True)
+    concluida_em = models.DateTimeField('Concluída em', null=True, blank=True)
+    worker = models.CharField('Worker', max_length=100, blank=True)
+    resultado = models.JSONField('Resultado', null=True, blank=True, encoder=DjangoJSONEncoder)
+    erro = models.TextField('Erro', blank=True)
+    criado_por = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        related_name='tarefas',
+        verbose_name='Criada por',
+        null=True,
+        blank=True
+    )
+    
+    class Meta:
+        verbose_name = 'Tarefa'
+        verbose_name_plural = 'Tarefas'
+        ordering = ['-created_at']
+        indexes = [
+            # Próxima tarefa pendente da fila
+            models.Index(fields=['status', 'executar_em'], name='tarefa_fila_idx'),
+            models.Index(fields=['company', '-created_at'], name='tarefa_company_idx'),
+        ]
+        constraints = [
+            # Uma única tarefa ativa por chave (ex.: um rebuild por empresa)
+            models.UniqueConstraint(
+                fields=['chave'],
+                condition=models.Q(status__in=['pendente', 'executando']),
+                name='tarefa_chave_ativa_uniq'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.tipo} ({self.get_status_display()})"
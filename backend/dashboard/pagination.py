@@ -0,0 +1,157 @@
+import base64
+import json
+from collections import OrderedDict
+from types import SimpleNamespace
+
+from django.core.exceptions import ValidationError
+from django.db.models import F, Field, Func, Value
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class Tupla(Func):
+    """Row value SQL: (a, b, c). Comparações usam o índice composto inteiro"""
+    function = ''
+    output_field = Field()
+
+
+class KeysetPagination:
+    """
+    Paginação por chave (keyset): cada página filtra a partir da última linha
+    da anterior com uma comparação de tupla, sem COUNT(*) nem OFFSET. O tempo
+    por página não depende da posição na listagem.
+
+    A ordenação é a da view (`keyset_ordering`), toda descendente e terminada
+    em um campo único (id) para desempate.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    invalid_cursor_message = 'Cursor inválido.'
+
+    def __init__(self, ordering, page_size):
+        assert all(campo.startswith('-') for campo in ordering), (
+            'keyset_ordering deve ser toda descendente'
+        )
+        self.campos = [campo[1:] for campo in ordering]
+        self.page_size = page_size
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+            if page_size > 0:
+                return min(page_size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return self.page_size
+
+    def encode_cursor(self, obj, reverse):
+        # Listagens pela leitura rápida paginam dicts de .values()
+        registro = SimpleNamespace(**obj) if isinstance(obj, dict) else obj
+        valores = [self.model._meta.get_field(campo).value_to_string(registro) for campo in self.campos]
+        raw = json.dumps({'v': valores, 'r': reverse}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, request):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None, False
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            data = json.loads(raw)
+            valores, reverse = data['v'], bool(data['r'])
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(valores, list) or len(valores) != len(self.campos):
+            raise NotFound(self.invalid_cursor_message)
+        return valores, reverse
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.model = queryset.model
+        page_size = self.get_page_size(request)
+        valores, reverse = self.decode_cursor(request)
+
+        chave = Tupla(*[F(campo) for campo in self.campos])
+        if reverse:
+            queryset = queryset.order_by(*self.campos)
+        else:
+            queryset = queryset.order_by(*[f'-{campo}' for campo in self.campos])
+
+        if valores is not None:
+            fields = [queryset.model._meta.get_field(campo) for campo in self.campos]
+            try:
+                limite = Tupla(*[
+                    Value(field.to_python(valor), output_field=field)
+                    for field, valor in zip(fields, valores)
+                ])
+            except ValidationError:
+                raise NotFound(self.invalid_cursor_message)
+            lookup = 'gt' if reverse else 'lt'
+            queryset = queryset.alias(_keyset=chave).filter(**{f'_keyset__{lookup}': limite})
+
+        # Uma linha a mais indica se existe página seguinte
+        page = list(queryset[:page_size + 1])
+        has_more = len(page) > page_size
+        page = page[:page_size]
+        if reverse:
+            page.reverse()
+
+        # Voltando a partir de um cursor sempre existe a página seguinte
+        self.has_next = True if reverse else has_more
+        self.has_previous = has_more if reverse else valores is not None
+        self.page = page
+        return page
+
+    def get_link(self, obj, reverse):
+        url = self.request.build_absolute_uri()
+        if obj is None:
+            return None
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(obj, reverse))
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.get_link(self.page[-1], False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        return self.get_link(self.page[0], True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+
+class DashboardPagination(PageNumberPagination):
+    """
+    Paginação por página (padrão da API). O cliente pode pedir paginação por
+    cursor por endpoint com ?paginacao=cursor (ou ao seguir um ?cursor=),
+    desde que a view declare `keyset_ordering`.
+    """
+
+    def usa_cursor(self, request, view):
+        return bool(getattr(view, 'keyset_ordering', None)) and (
+            request.query_params.get('paginacao') == 'cursor'
+            or KeysetPagination.cursor_query_param in request.query_params
+        )
+    
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.usa_cursor(request, view):
+            self.keyset = KeysetPagination(view.keyset_ordering, self.get_page_size(request))
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -0,0 +1,65 @@
+"""
+Formato colunar das séries temporais.
+
+Com ?format=columnar (ou Accept: application/vnd.v4vision.columnar+json) a
+série da resposta, a lista `results` da paginação ou a própria lista na raiz,
+vira uma tabela com um array por campo, em vez de repetir os nomes dos campos
+em cada linha:
+
+    {"linhas": 2,
+     "colunas": {"mes": [1, 2], "receita": ["10.00", "12.00"], ...},
+     "rotulos": {"mes": {"1": "Janeiro", "2": "Fevereiro"}}}
+
+Campos `<campo>_nome` que acompanham `<campo>` (mes_nome, semana_nome,
+vendedor_nome...) saem das colunas e vão uma única vez para `rotulos`. O
+resto da resposta (paginação, totais) e as estruturas aninhadas nas linhas
+não mudam; listas vazias continuam [].
+"""
+from core.renderers import ORJSONRenderer
+
+
+SUFIXO_ROTULO = '_nome'
+
+
+def colunar(data):
+    """Converte a série da resposta (lista na raiz ou `results`) em tabela"""
+    if isinstance(data, list):
+        return tabela(data) if _linhas(data) else data
+    if isinstance(data, dict) and _linhas(data.get('results')):
+        return {**data, 'results': tabela(data['results'])}
+    return data
+
+
+def _linhas(data):
+    return isinstance(data, list) and bool(data) and all(isinstance(item, dict) for item in data)
+
+
+def tabela(linhas):
+    campos = list(dict.fromkeys(campo for linha in linhas for campo in linha))
+    rotulados = [
+        campo[:-len(SUFIXO_ROTULO)] for campo in campos
+        if campo.endswith(SUFIXO_ROTULO) and campo[:-len(SUFIXO_ROTULO)] in campos
+    ]
+    ocultos = {f'{campo}{SUFIXO_ROTULO}' for campo in rotulados}
+
+    colunas = {campo: [] for campo in campos if campo not in ocultos}
+    rotulos = {campo: {} for campo in rotulados}
+    for linha in linhas:
+        for campo, coluna in colunas.items():
+            coluna.append(linha.get(campo))
+        for campo, valores in rotulos.items():
+            chave = linha.get(campo)
+            if chave is not None:
+                # Chaves de objeto JSON são strings (mês 1 -> "1", UUID -> texto)
+                valores[str(chave)] = linha.get(f'{campo}{SUFIXO_ROTULO}')
+
+    return {'linhas': len(linhas), 'colunas': colunas, 'rotulos': rotulos}
+
+
+class ColumnarRenderer(ORJSONRenderer):
+    """JSON com as listas de objetos em colunas (?format=columnar)"""
+    media_type = 'application/vnd.v4vision.columnar+json'
+    format = 'columnar'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return super().render(colunar(data), accepted_media_type, renderer_context)
@@ -0,0 +1,180 @@
+"""
+Gerador de dados sintéticos de empresas (multi-tenant) para testes de carga,
+benchmarks e verificação de planos de execução. Determinístico a partir da
+semente; grava com bulk_create e, no PostgreSQL, COPY nas tabelas grandes.
+"""
+import csv
+import io
+import random
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.models import Company, User
+from .models import (
+    Vendedor, ReceitaMensal, RetrospectivaAnual, VendaVendedor,
+    Estrategia, InvestimentoMensal, GestaoSemanal, Protocolo
+)
+
+
+BATCH_SIZE = 2000
+SENHA_PADRAO = 'v4vision-seed'
+
+
+def copy_insert(model, objs):
+    """
+    Insere as linhas com COPY no PostgreSQL (bem mais rápido que INSERT para
+    centenas de milhares de linhas) e com bulk_create nos demais bancos.
+    Retorna True quando usou COPY: nesse caso nenhum hook de bulk_create roda.
+    """
+    if connection.vendor != 'postgresql':
+        model.objects.bulk_create(objs, batch_size=BATCH_SIZE)
+        return False
+
+    agora = timezone.now()
+    campos = model._meta.concrete_fields
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC)
+    for obj in objs:
+        writer.writerow([
+            agora if getattr(f, 'auto_now', False) or getattr(f, 'auto_now_add', False)
+            else getattr(obj, f.attname)
+            for f in campos
+        ])
+    buffer.seek(0)
+
+    colunas = ', '.join(connection.ops.quote_name(f.column) for f in campos)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f'COPY {connection.ops.quote_name(model._meta.db_table)} ({colunas}) '
+            f'FROM STDIN WITH (FORMAT csv)',
+            buffer
+        )
+    return True
+
+
+@dataclass
+class SeedResult:
+    companies: list = field(default_factory=list)
+    users: list = field(default_factory=list)
+    anos: list = field(default_factory=list)
+    linhas: dict = field(default_factory=dict)
+
+
+def seed_tenants(companies=10, vendedores=8, anos=3, ano_final=2025,
+                 seed=42, prefix='seed', senha=SENHA_PADRAO):
+    """
+    Cria `companies` empresas, cada uma com `vendedores` vendedores, `anos` anos
+    de ReceitaMensal/VendaVendedor/GestaoSemanal, estratégias dos dois cenários
+    com InvestimentoMensal, protocolos e um usuário company_admin
+    (admin@<slug>.local).
+    """
+    rnd = random.Random(seed)
+    lista_anos = list(range(ano_final - anos + 1, ano_final + 1))
+    result = SeedResult(anos=lista_anos)
+
+    with transaction.atomic():
+        result.companies = Company.objects.bulk_create([
+            Company(name=f'{prefix.title()} {i:04d}', slug=f'{prefix}-{i:04d}')
+            for i in range(companies)
+        ], batch_size=BATCH_SIZE)
+
+        # Hash calculado uma única vez: PBKDF2 por usuário tornaria o seed lento
+        senha_hash = make_password(senha)
+        result.users = User.objects.bulk_create([
+            User(
+                email=f'admin@{company.slug}.local',
+                password=senha_hash,
+                first_name='Admin',
+                last_name=company.name,
+                company=company,
+                role=User.Role.COMPANY_ADMIN
+            )
+            for company in result.companies
+        ], batch_size=BATCH_SIZE)
+
+        equipes = {}
+        novos_vendedores, protocolos = [], []
+        for company in result.companies:
+            equipe = [
+                Vendedor(company=company, nome=f'Vendedor {j:02d}', email=f'vendedor{j}@{company.slug}.local')
+                for j in range(vendedores)
+            ]
+            equipes[company.pk] = equipe
+            novos_vendedores.extend(equipe)
+            protocolos.extend(
+                Protocolo(
+                    company=company, tipo=tipo, titulo=f'Protocolo {tipo}',
+                    descricao=f'Regras de {tipo}', ordem=ordem
+                )
+                for ordem, tipo in enumerate(Protocolo.Tipo.values)
+            )
+        Vendedor.objects.bulk_create(novos_vendedores, batch_size=BATCH_SIZE)
+        Protocolo.objects.bulk_create(protocolos, batch_size=BATCH_SIZE)
+
+        receitas, vendas, gestoes, estrategias = [], [], [], []
+        for company in result.companies:
+            escala = rnd.uniform(0.5, 3.0)
+            for ano in lista_anos:
+                for mes in range(1, 13):
+                    investimento = Decimal(round(rnd.uniform(5_000, 40_000) * escala, 2)).quantize(Decimal('0.01'))
+                    roas = rnd.uniform(2.0, 9.0)
+                    receitas.append(ReceitaMensal(
+                        company=company, ano=ano, mes=mes,
+                        receita=(investimento * Decimal(roas)).quantize(Decimal('0.01')),
+                        investimento=investimento,
+                        leads=rnd.randint(50, 900)
+                    ))
+                    vendas.extend(
+                        VendaVendedor(
+                            company=company, vendedor=vendedor, ano=ano, mes=mes,
+                            valor=Decimal(rnd.randint(1_000, 90_000))
+                        )
+                        for vendedor in equipes[company.pk]
+                    )
+                    gestoes.extend(
+                        GestaoSemanal(
+                            company=company, ano=ano, mes=mes, semana=semana,
+                            investimento=(investimento / 4).quantize(Decimal('0.01')),
+                            leads=rnd.randint(10, 250),
+                            vendas=(investimento / 4 * Decimal(rnd.uniform(1.5, 10.0))).quantize(Decimal('0.01'))
+                        )
+                        for semana in range(1, 5)
+                    )
+                estrategias.extend(
+                    Estrategia(
+                        company=company, ano=ano, cenario=cenario,
+                        orcamento_total=Decimal(300_000 * fator),
+                        receita_projetada=Decimal(1_800_000 * fator),
+                        roas_minimo=Decimal('4.00')
+                    )
+                    for cenario, fator in ((Estrategia.Cenario.CONSERVADOR, 1), (Estrategia.Cenario.OUSADO, 2))
+                )
+
+        if copy_insert(ReceitaMensal, receitas):
+            RetrospectivaAnual.objects.recalcular_chaves({(r.company_id, r.ano) for r in receitas})
+        copy_insert(VendaVendedor, vendas)
+        copy_insert(GestaoSemanal, gestoes)
+        Estrategia.objects.bulk_create(estrategias, batch_size=BATCH_SIZE)
+        investimentos = [
+            InvestimentoMensal(estrategia=estrategia, mes=mes, valor=(estrategia.orcamento_total / 12).quantize(Decimal('0.01')))
+            for estrategia in estrategias
+            for mes in range(1, 13)
+        ]
+        copy_insert(InvestimentoMensal, investimentos)
+
+    result.linhas = {
+        'companies': len(result.companies),
+        'users': len(result.users),
+        'vendedores': len(novos_vendedores),
+        'receitas': len(receitas),
+        'vendas_vendedor': len(vendas),
+        'gestao_semanal': len(gestoes),
+        'estrategias': len(estrategias),
+        'investimentos': len(investimentos),
+        'protocolos': len(protocolos),
+    }
+    return result
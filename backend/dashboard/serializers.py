@@ -1,8 +1,20 @@
-from rest_framework import serializers
+import decimal
+from datetime import datetime
+from decimal import Decimal
+from operator import itemgetter
+
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+from django.conf import settings
+from django.utils import timezone
+from django.db import transaction
+from django.db.models import Sum
 from .models import (
     Vendedor, ReceitaMensal, VendaVendedor, 
-    Estrategia, InvestimentoMensal, GestaoSemanal, Protocolo
+    Estrategia, InvestimentoMensal, GestaoSemanal, Protocolo, AlertaRoas, Tarefa,
+    calcular_roas
 )
+from .tarefas import TAREFAS
 
 
 class VendedorSerializer(serializers.ModelSerializer):
@@ -14,8 +26,11 @@ class VendedorSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
     
     def get_total_vendas(self, obj):
-        # Soma todas as vendas do vendedor
-        total = obj.vendas.aggregate(total=models.Sum('valor'))['total']
+        # Listagens já trazem o total anotado pelo VendedorViewSet
+        if hasattr(obj, 'total_vendas'):
+            total = obj.total_vendas
+        else:
+            total = obj.vendas.aggregate(total=Sum('valor'))['total']
         return float(total) if total else 0
 
 
@@ -45,6 +60,20 @@ class VendaVendedorSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 
+class VendaVendedorBulkSerializer(VendaVendedorSerializer):
+    """
+    Validação da importação em lote: o vendedor é resolvido contra os
+    vendedores da empresa pré-carregados no contexto, sem query por linha.
+    """
+    vendedor = serializers.UUIDField()
+    
+    def validate_vendedor(self, value):
+        vendedor = self.context['vendedores'].get(value)
+        if vendedor is None:
+            raise serializers.ValidationError('Vendedor não encontrado nesta empresa.')
+        return vendedor
+
+
 class InvestimentoMensalSerializer(serializers.ModelSerializer):
     mes_nome = serializers.CharField(source='get_mes_display', read_only=True)
     
@@ -67,9 +96,24 @@ class EstrategiaSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 
+def validate_plano_mensal(value):
+    meses = [inv['mes'] for inv in value]
+    if len(meses) != len(set(meses)):
+        raise serializers.ValidationError('Cada mês deve aparecer apenas uma vez.')
+    return value
+
+
+class PlanoMensalSerializer(serializers.Serializer):
+    """Payload de set_investimentos"""
+    investimentos = InvestimentoMensalSerializer(many=True)
+    
+    def validate_investimentos(self, value):
+        return validate_plano_mensal(value)
+
+
 class EstrategiaCreateSerializer(serializers.ModelSerializer):
-    investimentos = serializers.ListField(
-        child=serializers.DictField(),
+    investimentos = InvestimentoMensalSerializer(
+        many=True,
         write_only=True,
         required=False
     )
@@ -81,16 +125,18 @@ class EstrategiaCreateSerializer(serializers.ModelSerializer):
             'receita_projetada', 'roas_minimo', 'investimentos'
         ]
     
+    def validate_investimentos(self, value):
+        return validate_plano_mensal(value)
+    
     def create(self, validated_data):
         investimentos_data = validated_data.pop('investimentos', [])
-        estrategia = Estrategia.objects.create(**validated_data)
         
-        for inv in investimentos_data:
-            InvestimentoMensal.objects.create(
-                estrategia=estrategia,
-                mes=inv['mes'],
-                valor=inv['valor']
-            )
+        with transaction.atomic():
+            estrategia = Estrategia.objects.create(**validated_data)
+            InvestimentoMensal.objects.bulk_create([
+                InvestimentoMensal(estrategia=estrategia, mes=inv['mes'], valor=inv['valor'])
+                for inv in investimentos_data
+            ])
         
         return estrategia
 
@@ -121,6 +167,210 @@ class ProtocoloSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
 
 
+# Campos cuja representação é o próprio valor lido do banco
+CAMPOS_SEM_CONVERSAO = (
+    serializers.IntegerField, serializers.CharField,
+    serializers.ChoiceField, serializers.BooleanField
+)
+
+
+class ValuesListSerializer(serializers.ListSerializer):
+    """Resolve os conversores uma vez por listagem (não a cada linha)"""
+    
+    def to_representation(self, data):
+        conversores = self.child.get_conversores()
+        return [{nome: conversor(linha) for nome, conversor in conversores} for linha in data]
+
+
+class ValuesSerializer(serializers.BaseSerializer):
+    """
+    Leitura rápida das listagens: serializa as linhas de `.values()` (dicts)
+    em vez de instâncias do modelo, com a mesma saída (campos, ordem e
+    formatação) de `Meta.serializer_class`. Conversores e rótulos dos choices
+    são resolvidos uma vez por classe; propriedades do modelo ficam em
+    `Meta.computed`: {campo: (colunas, função(linha))}.
+    """
+    
+    class Meta:
+        list_serializer_class = ValuesListSerializer
+    
+    @classmethod
+    def values(cls, queryset):
+        if '_colunas' not in cls.__dict__:
+            cls._colunas = cls.montar_plano(None)[0]
+        return queryset.values(*cls._colunas)
+    
+    @classmethod
+    def get_conversores(cls):
+        """[(campo, conversor(linha))] no fuso atual (datas saem no fuso ativo)"""
+        fuso = timezone.get_current_timezone() if settings.USE_TZ else None
+        if '_conversores' not in cls.__dict__:
+            cls._conversores = {}
+        conversores = cls._conversores.get(fuso)
+        if conversores is None:
+            conversores = cls._conversores[fuso] = cls.montar_plano(fuso)[1]
+        return conversores
+    
+    @classmethod
+    def montar_plano(cls, fuso):
+        """(colunas do .values(), [(campo, conversor(linha))])"""
+        serializer_class = cls.Meta.serializer_class
+        model = serializer_class.Meta.model
+        computed = getattr(cls.Meta, 'computed', {})
+        colunas, conversores = [], []
+        
+        for nome, field in serializer_class().fields.items():
+            if field.write_only:
+                continue
+            if nome in computed:
+                fontes, funcao = computed[nome]
+                colunas.extend(fontes)
+                conversores.append((nome, _converter(funcao, _representacao(field, fuso))))
+                continue
+            
+            source = field.source
+            if source.startswith('get_') and source.endswith('_display'):
+                # Rótulo do choice (get_FOO_display) pré-calculado
+                coluna = source[len('get_'):-len('_display')]
+                rotulos = {
+                    valor: str(rotulo)
+                    for valor, rotulo in model._meta.get_field(coluna).flatchoices
+                }
+                conversor = _converter(
+                    itemgetter(coluna), lambda valor, rotulos=rotulos: rotulos.get(valor, str(valor))
+                )
+            elif isinstance(field, serializers.PrimaryKeyRelatedField):
+                # Chave estrangeira: o id já está na coluna *_id
+                coluna = model._meta.get_field(source).attname
+                conversor = itemgetter(coluna)
+            else:
+                coluna = source.replace('.', '__')
+                representar = _representacao(field, fuso)
+                conversor = itemgetter(coluna) if representar is None else _converter(itemgetter(coluna), representar)
+            colunas.append(coluna)
+            conversores.append((nome, conversor))
+        
+        return list(dict.fromkeys(colunas)), conversores
+    
+    def to_representation(self, linha):
+        return {nome: conversor(linha) for nome, conversor in self.get_conversores()}
+
+
+def _converter(ler, representar):
+    """Lê o valor da linha e aplica a representação do campo (None fica None)"""
+    def converter(linha):
+        valor = ler(linha)
+        return None if valor is None else representar(valor)
+    return converter
+
+
+def _representacao(field, fuso):
+    """
+    to_representation do campo, com atalhos para Decimal e DateTime (mesma
+    saída, sem reler settings e fuso a cada valor). None: o próprio valor.
+    """
+    if isinstance(field, CAMPOS_SEM_CONVERSAO):
+        return None
+    
+    if (
+        isinstance(field, serializers.DecimalField)
+        and field.decimal_places is not None
+        and not field.localize
+        and getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+    ):
+        expoente = Decimal('.1') ** field.decimal_places
+        contexto = decimal.getcontext().copy()
+        if field.max_digits is not None:
+            contexto.prec = field.max_digits
+        
+        def representar_decimal(valor):
+            if not isinstance(valor, Decimal):
+                return field.to_representation(valor)
+            return '{:f}'.format(valor.quantize(expoente, rounding=field.rounding, context=contexto))
+        return representar_decimal
+    
+    if (
+        isinstance(field, serializers.DateTimeField)
+        and fuso is not None
+        and not hasattr(field, 'timezone')
+        and str(getattr(field, 'format', api_settings.DATETIME_FORMAT)).lower() == ISO_8601
+    ):
+        def representar_datetime(valor):
+            if not isinstance(valor, datetime) or valor.utcoffset() is None:
+                return field.to_representation(valor)
+            texto = valor.astimezone(fuso).isoformat()
+            return texto[:-6] + 'Z' if texto.endswith('+00:00') else texto
+        return representar_datetime
+    
+    return field.to_representation
+
+
+class ReceitaMensalValuesSerializer(ValuesSerializer):
+    class Meta(ValuesSerializer.Meta):
+        serializer_class = ReceitaMensalSerializer
+        computed = {
+            'roas': (
+                ['receita', 'investimento'],
+                lambda linha: calcular_roas(linha['receita'], linha['investimento'])
+            ),
+        }
+
+
+class VendaVendedorValuesSerializer(ValuesSerializer):
+    class Meta(ValuesSerializer.Meta):
+        serializer_class = VendaVendedorSerializer
+
+
+class GestaoSemanalValuesSerializer(ValuesSerializer):
+    class Meta(ValuesSerializer.Meta):
+        serializer_class = GestaoSemanalSerializer
+        computed = {
+            'roas': (
+                ['vendas', 'investimento'],
+                lambda linha: calcular_roas(linha['vendas'], linha['investimento'])
+            ),
+        }
+
+
+class ProtocoloValuesSerializer(ValuesSerializer):
+    class Meta(ValuesSerializer.Meta):
+        serializer_class = ProtocoloSerializer
+
+
+class AlertaRoasSerializer(serializers.ModelSerializer):
+    periodo_nome = serializers.CharField(source='get_periodo_display', read_only=True)
+    mes_nome = serializers.CharField(source='get_mes_display', read_only=True)
+    cenario = serializers.CharField(source='estrategia.cenario', read_only=True)
+    
+    class Meta:
+        model = AlertaRoas
+        fields = [
+            'id', 'estrategia', 'cenario', 'ano', 'mes', 'mes_nome',
+            'semana', 'periodo', 'periodo_nome', 'investimento', 'vendas',
+            'roas', 'roas_minimo', 'created_at'
+        ]
+        read_only_fields = fields
+
+
+class TarefaSerializer(serializers.ModelSerializer):
+    status_nome = serializers.CharField(source='get_status_display', read_only=True)
+    
+    class Meta:
+        model = Tarefa
+        fields = [
+            'id', 'company', 'tipo', 'parametros', 'status', 'status_nome',
+            'tentativas', 'max_tentativas', 'executar_em', 'iniciada_em',
+            'concluida_em', 'resultado', 'erro', 'created_at'
+        ]
+        read_only_fields = fields
+
+
+class TarefaCreateSerializer(serializers.Serializer):
+    """Enfileiramento de uma tarefa em segundo plano"""
+    tipo = serializers.ChoiceField(choices=sorted(TAREFAS))
+    parametros = serializers.DictField(required=False, default=dict)
+
+
 # Serializers para Dashboard/Retrospectiva
 class RetrospectivaSummarySerializer(serializers.Serializer):
     """Resumo da retrospectiva anual"""
@@ -136,7 +386,3 @@ class ComparativoVendedoresSerializer(serializers.Serializer):
     """Comparativo de vendas por vendedor"""
     vendedor = serializers.CharField()
     total = serializers.DecimalField(max_digits=12, decimal_places=2)
-
-
-# Import para aggregate
-from django.db import models
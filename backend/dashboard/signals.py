@@ -0,0 +1,30 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.models import Company
+from .models import (
+    Vendedor, ReceitaMensal, VendaVendedor,
+    Estrategia, InvestimentoMensal, GestaoSemanal, Protocolo
+)
+
+
+COMPANY_MODELS = [Vendedor, ReceitaMensal, VendaVendedor, Estrategia, GestaoSemanal, Protocolo]
+
+
+def invalidar_cache_empresa(sender, instance, **kwargs):
+    """Escritas em modelos com company invalidam o cache da empresa"""
+    Company.objects.bump_data_version(instance.company_id)
+
+
+for model in COMPANY_MODELS:
+    post_save.connect(invalidar_cache_empresa, sender=model, dispatch_uid=f'cache_{model.__name__}_save')
+    post_delete.connect(invalidar_cache_empresa, sender=model, dispatch_uid=f'cache_{model.__name__}_delete')
+
+
+@receiver(post_save, sender=InvestimentoMensal, dispatch_uid='cache_InvestimentoMensal_save')
+@receiver(post_delete, sender=InvestimentoMensal, dispatch_uid='cache_InvestimentoMensal_delete')
+def invalidar_cache_investimento(sender, instance, **kwargs):
+    company_id = Estrategia.objects.filter(
+        pk=instance.estrategia_id
+    ).values_list('company_id', flat=True).first()
+    Company.objects.bump_data_version(company_id)
@@ -0,0 +1,148 @@
+"""
+Simulação de Monte Carlo das estratégias (vetorizada com NumPy).
+
+Cada caminho sorteia, com reposição, um ROAS mensal do histórico da empresa
+(ReceitaMensal) para cada mês do plano. O gasto segue o InvestimentoMensal
+planejado, exceto quando o ROAS do mês anterior ficou abaixo do roas_minimo
+da estratégia: o investimento é congelado (não passa do gasto do mês anterior)
+até o ROAS voltar ao mínimo. Os cenários são simulados com os mesmos sorteios,
+então a diferença entre eles vem só do plano.
+"""
+import numpy as np
+
+from .models import ReceitaMensal
+
+
+MESES = 12
+PERCENTIS = (5, 25, 50, 75, 95)
+MIN_HISTORICO = 3
+
+# Caminhos de Monte Carlo (padrão e máximo)
+SIMULACAO_CAMINHOS = 10000
+SIMULACAO_MAX_CAMINHOS = 50000
+
+
+def roas_historico(company_id, meses=36):
+    """ROAS dos últimos `meses` meses com investimento da empresa"""
+    linhas = ReceitaMensal.objects.filter(
+        company_id=company_id, investimento__gt=0
+    ).order_by('-ano', '-mes').values_list('receita', 'investimento')[:meses]
+    if not linhas:
+        return np.empty(0)
+    valores = np.array(linhas, dtype=float)
+    return valores[:, 0] / valores[:, 1]
+
+
+def plano_mensal(estrategia):
+    """Investimento planejado por mês; sem plano, o orçamento dividido por 12"""
+    investimentos = list(estrategia.investimentos_mensais.all())
+    if not investimentos:
+        return np.full(MESES, float(estrategia.orcamento_total) / MESES)
+
+    plano = np.zeros(MESES)
+    for investimento in investimentos:
+        plano[investimento.mes - 1] = float(investimento.valor)
+    return plano
+
+
+def simular(plano, roas_minimo, roas):
+    """
+    Aplica o plano aos ROAS sorteados (caminhos x meses). Retorna gasto,
+    receita e a máscara dos meses em que o investimento estava congelado.
+    """
+    caminhos = roas.shape[0]
+    gasto = np.empty_like(roas)
+    congelado = np.zeros_like(roas, dtype=bool)
+    anterior = np.full(caminhos, np.inf)
+    abaixo = np.zeros(caminhos, dtype=bool)
+
+    # Laço só nos 12 meses; cada passo é vetorizado sobre todos os caminhos
+    for mes in range(MESES):
+        congelado[:, mes] = abaixo
+        gasto[:, mes] = np.where(abaixo, np.minimum(plano[mes], anterior), plano[mes])
+        anterior = gasto[:, mes]
+        abaixo = roas[:, mes] < roas_minimo
+
+    return gasto, gasto * roas, congelado
+
+
+def bandas(valores):
+    """Percentis de cada coluna (ou do vetor): [{'p5': ..., 'p95': ...}, ...]"""
+    percentis = np.percentile(valores, PERCENTIS, axis=0)
+    if percentis.ndim == 1:
+        return {f'p{p}': round(float(v), 2) for p, v in zip(PERCENTIS, percentis)}
+    return [
+        {f'p{p}': round(float(v), 2) for p, v in zip(PERCENTIS, coluna)}
+        for coluna in percentis.T
+    ]
+
+
+def simular_cenarios(estrategias, roas, caminhos=10000, seed=None):
+    """
+    Simula as estratégias (um resultado por cenário) sobre os mesmos
+    `caminhos` sorteios do histórico de ROAS.
+    """
+    rng = np.random.default_rng(seed)
+    sorteio = rng.choice(roas, size=(caminhos, MESES), replace=True)
+    nomes = dict(ReceitaMensal.Mes.choices)
+
+    cenarios = {}
+    for estrategia in estrategias:
+        plano = plano_mensal(estrategia)
+        gasto, receita, congelado = simular(plano, float(estrategia.roas_minimo), sorteio)
+
+        receita_total = receita.sum(axis=1)
+        gasto_total = gasto.sum(axis=1)
+        roas_total = np.divide(
+            receita_total, gasto_total,
+            out=np.zeros_like(receita_total), where=gasto_total > 0
+        )
+
+        meses = [
+            {
+                'mes': mes + 1,
+                'mes_nome': nomes[mes + 1],
+                'investimento_planejado': round(float(plano[mes]), 2),
+                'gasto': banda_gasto,
+                'receita': banda_receita,
+                'receita_acumulada': banda_acumulada,
+                'probabilidade_congelado': round(float(congelado[:, mes].mean()), 4),
+            }
+            for mes, (banda_gasto, banda_receita, banda_acumulada) in enumerate(zip(
+                bandas(gasto), bandas(receita), bandas(receita.cumsum(axis=1))
+            ))
+        ]
+
+        cenarios[estrategia.cenario] = {
+            'estrategia_id': estrategia.id,
+            'cenario': estrategia.cenario,
+            'cenario_nome': estrategia.get_cenario_display(),
+            'orcamento_total': estrategia.orcamento_total,
+            'receita_projetada': estrategia.receita_projetada,
+            'roas_minimo': estrategia.roas_minimo,
+            'meses': meses,
+            'total': {
+                'gasto': bandas(gasto_total),
+                'receita': bandas(receita_total),
+                'roas': bandas(roas_total),
+            },
+            'probabilidade_meta': round(
+                float((receita_total >= float(estrategia.receita_projetada)).mean()), 4
+            ),
+            'meses_congelados_medio': round(float(congelado.sum(axis=1).mean()), 2),
+        }
+
+    return cenarios
+
+
+def resumo_simulacao(estrategias, roas, ano, caminhos=10000, seed=None):
+    """Resultado completo da simulação (endpoint e tarefa em segundo plano)"""
+    return {
+        'ano': ano,
+        'caminhos': caminhos,
+        'historico': {
+            'meses': len(roas),
+            'roas_medio': round(float(roas.mean()), 2),
+        },
+        'cenarios': simular_cenarios(estrategias, roas, caminhos, seed),
+    }
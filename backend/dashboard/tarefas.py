@@ -0,0 +1,241 @@
+"""
+Fila de tarefas em segundo plano guardada no banco (sem Redis nem Celery).
+
+Requisições enfileiram o trabalho pesado (rebuild de consolidados, avaliação
+de alertas, simulações grandes) com `enfileirar` e respondem na hora; o
+comando processar_tarefas executa a fila fora dos workers do gunicorn.
+
+- Reserva: SELECT ... FOR UPDATE SKIP LOCKED (workers concorrentes pulam as
+  linhas já travadas por outro).
+- Deduplicação: tarefas com a mesma `chave` não ficam ativas ao mesmo tempo
+  (índice único parcial); enfileirar de novo devolve a que já existe.
+- Retentativas: erros voltam a tarefa para a fila com espera exponencial até
+  `max_tentativas`; TarefaInvalida falha de vez.
+"""
+import hashlib
+import json
+import logging
+import traceback
+from datetime import timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, models, transaction
+from django.utils import timezone
+
+from core.db.router import ler_da_replica
+from core.models import Company
+from .alertas import avaliar_empresas
+from .models import Estrategia, RetrospectivaAnual, Tarefa
+from .simulacao import (
+    MIN_HISTORICO, SIMULACAO_CAMINHOS, SIMULACAO_MAX_CAMINHOS,
+    resumo_simulacao, roas_historico
+)
+
+
+logger = logging.getLogger('v4vision.tarefas')
+
+# Espera antes da próxima tentativa: 30s, 60s, 120s... até 1h
+BACKOFF_BASE = 30
+BACKOFF_MAX = 3600
+
+# Tarefa executando há mais tempo que isso: o worker morreu no meio
+TEMPO_LIMITE = timedelta(minutes=30)
+
+TAREFAS = {}
+
+
+class TarefaInvalida(Exception):
+    """Erro definitivo (parâmetros ou dados): falha sem novas tentativas"""
+
+
+def tarefa(tipo, max_tentativas=3, chave_por_parametros=False):
+    """
+    Registra a função de um tipo de tarefa. Por padrão só uma tarefa do tipo
+    fica ativa por empresa; com `chave_por_parametros`, uma por empresa e
+    conjunto de parâmetros.
+    """
+    def registrar(func):
+        func.max_tentativas = max_tentativas
+        func.chave_por_parametros = chave_por_parametros
+        TAREFAS[tipo] = func
+        return func
+    return registrar
+
+
+def chave_padrao(tipo, company_id, parametros):
+    func = TAREFAS[tipo]
+    chave = f'{tipo}:{company_id or "todas"}'
+    if func.chave_por_parametros:
+        raw = json.dumps(parametros, sort_keys=True, default=str)
+        chave += ':' + hashlib.sha256(raw.encode()).hexdigest()[:16]
+    return chave
+
+
+def enfileirar(tipo, company_id=None, parametros=None, chave=None, criado_por_id=None):
+    """
+    Cria uma tarefa pendente. Se já existe uma ativa com a mesma chave, ela é
+    devolvida no lugar. Retorna (tarefa, criada).
+    """
+    if tipo not in TAREFAS:
+        raise ValueError(f'Tipo de tarefa desconhecido: {tipo}')
+    parametros = parametros or {}
+    chave = chave or chave_padrao(tipo, company_id, parametros)
+
+    ativa = Tarefa.objects.filter(chave=chave, status__in=Tarefa.ATIVAS).first()
+    if ativa is not None:
+        return ativa, False
+    try:
+        with transaction.atomic():
+            return Tarefa.objects.create(
+                tipo=tipo,
+                company_id=company_id,
+                parametros=parametros,
+                chave=chave,
+                max_tentativas=TAREFAS[tipo].max_tentativas,
+                criado_por_id=criado_por_id
+            ), True
+    except IntegrityError:
+        # Outra requisição criou a mesma chave entre a leitura e o INSERT
+        return Tarefa.objects.get(chave=chave, status__in=Tarefa.ATIVAS), False
+
+
+def reservar(worker, tipos=None):
+    """Reserva a próxima tarefa pendente (None com a fila vazia)"""
+    agora = timezone.now()
+    with transaction.atomic():
+        fila = Tarefa.objects.select_for_update(skip_locked=True).filter(
+            status=Tarefa.Status.PENDENTE, executar_em__lte=agora
+        )
+        if tipos:
+            fila = fila.filter(tipo__in=tipos)
+        tarefa = fila.order_by('executar_em').first()
+        if tarefa is None:
+            return None
+
+        tarefa.status = Tarefa.Status.EXECUTANDO
+        tarefa.tentativas += 1
+        tarefa.iniciada_em = agora
+        tarefa.worker = worker
+        tarefa.save(update_fields=['status', 'tentativas', 'iniciada_em', 'worker', 'updated_at'])
+    return tarefa
+
+
+def backoff(tentativas):
+    return timedelta(seconds=min(BACKOFF_BASE * 2 ** (tentativas - 1), BACKOFF_MAX))
+
+
+def executar(tarefa):
+    """Executa uma tarefa reservada e grava o resultado, o erro ou a nova tentativa"""
+    inicio = timezone.now()
+    try:
+        func = TAREFAS.get(tarefa.tipo)
+        if func is None:
+            raise TarefaInvalida(f'Tipo de tarefa desconhecido: {tarefa.tipo}')
+        # Um resultado que não vira JSON conta como falha da tarefa, não do save
+        resultado = json.loads(json.dumps(func(tarefa), cls=DjangoJSONEncoder))
+    except Exception as exc:
+        definitiva = isinstance(exc, TarefaInvalida) or tarefa.tentativas >= tarefa.max_tentativas
+        tarefa.erro = str(exc) if isinstance(exc, TarefaInvalida) else traceback.format_exc()
+        if definitiva:
+            tarefa.status = Tarefa.Status.FALHOU
+            tarefa.concluida_em = timezone.now()
+        else:
+            tarefa.status = Tarefa.Status.PENDENTE
+            tarefa.executar_em = timezone.now() + backoff(tarefa.tentativas)
+    else:
+        tarefa.status = Tarefa.Status.CONCLUIDA
+        tarefa.resultado = resultado
+        tarefa.erro = ''
+        tarefa.concluida_em = timezone.now()
+
+    tarefa.save(update_fields=[
+        'status', 'resultado', 'erro', 'executar_em', 'concluida_em', 'updated_at'
+    ])
+    logger.info(json.dumps({
+        'event': 'tarefa',
+        'id': str(tarefa.pk),
+        'tipo': tarefa.tipo,
+        'status': tarefa.status,
+        'tentativa': tarefa.tentativas,
+        'worker': tarefa.worker,
+        'duration_ms': round((timezone.now() - inicio).total_seconds() * 1000, 2),
+    }))
+    return tarefa
+
+
+def recuperar_travadas(limite=TEMPO_LIMITE):
+    """
+    Tarefas 'executando' há mais de `limite` (worker encerrado no meio) voltam
+    para a fila, ou falham se já esgotaram as tentativas.
+    """
+    agora = timezone.now()
+    travadas = Tarefa.objects.filter(status=Tarefa.Status.EXECUTANDO, iniciada_em__lt=agora - limite)
+    falhas = travadas.filter(tentativas__gte=models.F('max_tentativas')).update(
+        status=Tarefa.Status.FALHOU,
+        erro='Tempo limite excedido (worker encerrado durante a execução).',
+        concluida_em=agora,
+        updated_at=agora
+    )
+    reenfileiradas = travadas.update(status=Tarefa.Status.PENDENTE, executar_em=agora, updated_at=agora)
+    return reenfileiradas, falhas
+
+
+def _inteiro(parametros, nome, padrao=None):
+    valor = parametros.get(nome, padrao)
+    if valor is None:
+        return None
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        raise TarefaInvalida(f'Parâmetro inválido: {nome}.')
+
+
+@tarefa('reconstruir_retrospectiva')
+def reconstruir_retrospectiva(tarefa):
+    """Reconstrói o consolidado anual da empresa (ou de todas)"""
+    with transaction.atomic():
+        total = RetrospectivaAnual.objects.reconstruir(
+            company_id=tarefa.company_id,
+            ano=_inteiro(tarefa.parametros, 'ano')
+        )
+        if tarefa.company_id:
+            Company.objects.bump_data_version(tarefa.company_id)
+    return {'consolidados': total}
+
+
+@tarefa('avaliar_alertas_roas')
+def avaliar_alertas_roas(tarefa):
+    """Avalia os alertas de ROAS do mês da empresa (ou de todas)"""
+    hoje = timezone.localdate()
+    return avaliar_empresas(
+        ano=_inteiro(tarefa.parametros, 'ano', hoje.year),
+        mes=_inteiro(tarefa.parametros, 'mes', hoje.month),
+        forcar=bool(tarefa.parametros.get('forcar')),
+        company_ids=[tarefa.company_id] if tarefa.company_id else None
+    )
+
+
+@tarefa('simulacao', max_tentativas=1, chave_por_parametros=True)
+def simulacao(tarefa):
+    """Simulação de Monte Carlo dos cenários do ano (caminhos acima do síncrono)"""
+    if not tarefa.company_id:
+        raise TarefaInvalida('Informe a empresa.')
+    ano = _inteiro(tarefa.parametros, 'ano', timezone.localdate().year)
+    caminhos = _inteiro(tarefa.parametros, 'caminhos', SIMULACAO_CAMINHOS)
+    if not 100 <= caminhos <= SIMULACAO_MAX_CAMINHOS:
+        raise TarefaInvalida(f'Informe entre 100 e {SIMULACAO_MAX_CAMINHOS} caminhos.')
+
+    # Só leitura de histórico: pode vir de uma réplica
+    with ler_da_replica():
+        estrategias = list(
+            Estrategia.objects.filter(company_id=tarefa.company_id, ano=ano)
+            .prefetch_related('investimentos_mensais')
+            .order_by('cenario')
+        )
+        roas = roas_historico(tarefa.company_id)
+    if not estrategias:
+        raise TarefaInvalida('Nenhuma estratégia cadastrada para o ano.')
+    if len(roas) < MIN_HISTORICO:
+        raise TarefaInvalida(f'São necessários ao menos {MIN_HISTORICO} meses de receita com investimento.')
+
+    return resumo_simulacao(estrategias, roas, ano, caminhos, _inteiro(tarefa.parametros, 'seed'))
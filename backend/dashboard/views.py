@@ -1,196 +1,732 @@
-from rest_framework import viewsets, status
+import csv
+import io
+import itertools
+import json
+import uuid
+from decimal import Decimal, InvalidOperation
+
+from asgiref.sync import sync_to_async
+from rest_framework import mixins, viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
-from django.db.models import Sum, F, Max
+from rest_framework.settings import api_settings
+from rest_framework.filters import OrderingFilter
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.db.models import Sum, F, Max, Q, DecimalField, Value
 from django.db.models.functions import Coalesce
+from django_filters.rest_framework import DjangoFilterBackend
 
+from core.models import Company
 from core.permissions import CanEditOrReadOnly
+from .cache import tenant_cached
+from .pagination import DashboardPagination
+from .renderers import ColumnarRenderer
+from .simulacao import (
+    MIN_HISTORICO, SIMULACAO_CAMINHOS, SIMULACAO_MAX_CAMINHOS,
+    roas_historico, resumo_simulacao
+)
 from .models import (
-    Vendedor, ReceitaMensal, VendaVendedor,
-    Estrategia, InvestimentoMensal, GestaoSemanal, Protocolo
+    Vendedor, ReceitaMensal, RetrospectivaAnual, VendaVendedor,
+    Estrategia, InvestimentoMensal, GestaoSemanal, Protocolo, AlertaRoas, Tarefa,
+    RECONCILIACAO_TOLERANCIA, resumir_reconciliacao
 )
 from .serializers import (
     VendedorSerializer, ReceitaMensalSerializer, VendaVendedorSerializer,
-    EstrategiaSerializer, EstrategiaCreateSerializer, GestaoSemanalSerializer,
-    ProtocoloSerializer
+    VendaVendedorBulkSerializer, EstrategiaSerializer, EstrategiaCreateSerializer,
+    PlanoMensalSerializer, GestaoSemanalSerializer, ProtocoloSerializer,
+    AlertaRoasSerializer, TarefaSerializer, TarefaCreateSerializer,
+    ReceitaMensalValuesSerializer, VendaVendedorValuesSerializer,
+    GestaoSemanalValuesSerializer, ProtocoloValuesSerializer
 )
+from .tarefas import enfileirar
+
 
+# Limite de anos por consulta de tendência
+TENDENCIA_MAX_ANOS = 20
+
+# Séries temporais também respondem em colunas (?format=columnar)
+SERIE_RENDERER_CLASSES = [*api_settings.DEFAULT_RENDERER_CLASSES, ColumnarRenderer]
 
 class CompanyFilterMixin:
     """Mixin para filtrar queryset por empresa do usuário"""
+    # Relações lidas pelo serializer (JOIN em vez de uma query por linha)
+    select_related_fields = ()
+    # Colunas lidas em list/retrieve (inclui company_id, usado nas permissões)
+    only_fields = ()
     
     def get_queryset(self):
-        qs = super().get_queryset()
+        qs = self.filter_by_company(super().get_queryset())
+        if self.select_related_fields:
+            qs = qs.select_related(*self.select_related_fields)
+        if self.only_fields and self.action in ('list', 'retrieve'):
+            qs = qs.only(*self.only_fields)
+        return qs
+    
+    def filter_by_company(self, qs):
+        """Aplica o escopo de empresa do usuário a qualquer queryset"""
         user = self.request.user
         
         # Platform admin vê tudo
         if user.is_platform_admin:
-            company_id = self.request.query_params.get('company')
+            company_id = self.get_company_id()
             if company_id:
                 return qs.filter(company_id=company_id)
             return qs
         
         # Outros usuários veem apenas sua empresa
-        if user.company:
-            return qs.filter(company=user.company)
+        if user.company_id:
+            return qs.filter(company_id=user.company_id)
         
         return qs.none()
     
+    def get_company_id(self):
+        """Empresa única da requisição (None para todas as empresas)"""
+        user = self.request.user
+        if user.is_platform_admin:
+            company_id = self.request.query_params.get('company')
+            return self.parse_company_id(company_id) if company_id else None
+        return user.company_id
+    
     def perform_create(self, serializer):
         """Adiciona company automaticamente ao criar"""
+        serializer.save(company=self.get_write_company())
+    
+    def get_write_company(self):
+        """Empresa de destino das escritas"""
         user = self.request.user
         company = user.company
         
-        # Platform admin pode especificar company
+        # Platform admin pode especificar company (no corpo ou na query string)
         if user.is_platform_admin:
-            company_id = self.request.data.get('company')
+            company_id = None
+            if isinstance(self.request.data, dict):
+                company_id = self.request.data.get('company')
+            company_id = company_id or self.request.query_params.get('company')
             if company_id:
-                from core.models import Company
-                company = Company.objects.get(id=company_id)
+                company = Company.objects.filter(id=self.parse_company_id(company_id)).first()
+                if company is None:
+                    raise ValidationError({'company': 'Empresa não encontrada.'})
+        
+        return company
+    
+    def parse_company_id(self, company_id):
+        """UUID da empresa informada pelo platform admin (400 se malformado)"""
+        try:
+            return uuid.UUID(str(company_id))
+        except ValueError:
+            raise ValidationError({'company': 'Empresa inválida.'})
+
+
+class ValuesListMixin:
+    """
+    Listagem pela leitura rápida: com `values_serializer_class`, o list lê
+    dicts de .values() e os serializa sem instanciar o modelo (mesma saída
+    do serializer_class). Retrieve e escritas seguem com o serializer_class.
+    """
+    values_serializer_class = None
+    
+    def usa_values(self):
+        return self.values_serializer_class is not None and self.action == 'list'
+    
+    def get_queryset(self):
+        qs = super().get_queryset()
+        if self.usa_values():
+            qs = self.values_serializer_class.values(qs)
+        return qs
+    
+    def get_serializer_class(self):
+        if self.usa_values():
+            return self.values_serializer_class
+        return super().get_serializer_class()
+
+
+class BulkUpsertMixin:
+    """
+    Importação em lote (POST .../bulk/) a partir de um array JSON ou de um
+    arquivo CSV (campo `file`). As linhas são validadas em memória e gravadas
+    com um único bulk_create(update_conflicts=True) usando a chave única do
+    modelo.
+    
+    Por padrão nada é gravado se alguma linha for inválida; com
+    ?parcial=true as linhas válidas são gravadas e as inválidas reportadas.
+    """
+    bulk_serializer_class = None
+    bulk_unique_fields = []
+    bulk_update_fields = []
+    bulk_max_rows = 5000
+    bulk_batch_size = 500
+    
+    def get_bulk_serializer_class(self):
+        return self.bulk_serializer_class or self.get_serializer_class()
+    
+    def get_bulk_serializer_context(self, company):
+        return self.get_serializer_context()
+    
+    def parse_bulk_rows(self, request):
+        """Lê as linhas do CSV enviado ou do array JSON"""
+        upload = request.FILES.get('file')
+        if upload is not None:
+            reader = csv.DictReader(io.TextIOWrapper(upload, encoding='utf-8-sig'))
+            # Colunas vazias ficam com o valor padrão do modelo
+            return [
+                {k.strip(): v.strip() for k, v in row.items() if k and v and v.strip()}
+                for row in reader
+            ]
+        
+        rows = request.data
+        if isinstance(rows, dict):
+            rows = rows.get('rows')
+        if not isinstance(rows, list):
+            raise ValidationError(
+                {'detail': 'Envie um array JSON de linhas ou um arquivo CSV no campo "file".'}
+            )
+        return rows
+    
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """Importa/atualiza várias linhas de uma vez"""
+        company = self.get_write_company()
+        if company is None:
+            raise ValidationError({'company': 'Informe a empresa de destino.'})
+        
+        rows = self.parse_bulk_rows(request)
+        if len(rows) > self.bulk_max_rows:
+            raise ValidationError(
+                {'detail': f'Máximo de {self.bulk_max_rows} linhas por importação.'}
+            )
+        
+        serializer_class = self.get_bulk_serializer_class()
+        context = self.get_bulk_serializer_context(company)
+        model = self.get_queryset().model
+        
+        objs, erros, chaves = [], [], {}
+        for linha, row in enumerate(rows, start=1):
+            if not isinstance(row, dict):
+                erros.append({'linha': linha, 'erros': {'detail': 'Linha inválida.'}})
+                continue
+            
+            serializer = serializer_class(data=row, context=context)
+            if not serializer.is_valid():
+                erros.append({'linha': linha, 'erros': serializer.errors})
+                continue
+            
+            obj = model(company=company, **serializer.validated_data)
+            chave = tuple(
+                getattr(obj, model._meta.get_field(campo).attname)
+                for campo in self.bulk_unique_fields
+            )
+            if chave in chaves:
+                erros.append({
+                    'linha': linha,
+                    'erros': {'detail': f'Duplicada da linha {chaves[chave]}.'}
+                })
+                continue
+            
+            chaves[chave] = linha
+            objs.append(obj)
         
-        serializer.save(company=company)
+        parcial = request.query_params.get('parcial') in ('1', 'true')
+        if erros and not parcial:
+            return Response(
+                {'total': len(rows), 'importados': 0, 'erros': erros},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        with transaction.atomic():
+            model.objects.bulk_create(
+                objs,
+                batch_size=self.bulk_batch_size,
+                update_conflicts=True,
+                unique_fields=self.bulk_unique_fields,
+                update_fields=self.bulk_update_fields
+            )
+        
+        return Response({'total': len(rows), 'importados': len(objs), 'erros': erros})
+
+
+class Echo:
+    """Pseudo-buffer: o csv.writer devolve a linha em vez de acumulá-la"""
+    
+    def write(self, value):
+        return value
+
+
+class ExportMixin:
+    """
+    Exportação completa (GET .../export/?formato=csv|ndjson) via
+    StreamingHttpResponse. As linhas são lidas com values_list().iterator(),
+    então a memória do worker não cresce com o tamanho da tabela (sob ASGI,
+    em blocos por um iterador assíncrono). Respeita o escopo de empresa e os
+    filterset_fields da listagem.
+    """
+    export_fields = []
+    
+    def get_export_queryset(self):
+        qs = self.filter_queryset(self.get_queryset())
+        return qs.prefetch_related(None).values_list(*self.export_fields)
+    
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Exporta todas as linhas filtradas em CSV ou NDJSON"""
+        formato = request.query_params.get('formato', 'csv')
+        if formato not in ('csv', 'ndjson'):
+            raise ValidationError({'formato': 'Use "csv" ou "ndjson".'})
+        
+        colunas = [campo.replace('__', '_') for campo in self.export_fields]
+        linhas = self.get_export_queryset().iterator(
+            chunk_size=getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+        )
+        
+        if formato == 'csv':
+            writer = csv.writer(Echo())
+            conteudo = (
+                writer.writerow(linha)
+                for linha in _prepend(colunas, linhas)
+            )
+            content_type = 'text/csv; charset=utf-8'
+        else:
+            conteudo = (
+                json.dumps(dict(zip(colunas, linha)), cls=DjangoJSONEncoder) + '\n'
+                for linha in linhas
+            )
+            content_type = 'application/x-ndjson'
+        
+        if isinstance(request._request, ASGIRequest):
+            # Sob ASGI um iterador síncrono seria lido inteiro antes do envio
+            conteudo = _em_blocos(conteudo, getattr(settings, 'EXPORT_CHUNK_SIZE', 2000))
+        
+        nome = f'{self.basename}-{timezone.localdate():%Y%m%d}.{formato}'
+        response = StreamingHttpResponse(conteudo, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{nome}"'
+        return response
+
+
+def _prepend(primeira, linhas):
+    yield primeira
+    yield from linhas
+
+
+async def _em_blocos(conteudo, tamanho):
+    """
+    Iterador assíncrono sobre as linhas da exportação, `tamanho` linhas por
+    vez, lidas na thread da requisição (a mesma conexão do cursor)
+    """
+    proximo = sync_to_async(lambda: ''.join(itertools.islice(conteudo, tamanho)))
+    while bloco := await proximo():
+        yield bloco
+
+
+def consolidados_retrospectiva(view, ano):
+    """Consolidado pré-calculado (uma linha por empresa/ano): totais e pico"""
+    return list(view.filter_by_company(RetrospectivaAnual.objects.filter(ano=ano)))
+
+
+def receitas_retrospectiva(view, ano):
+    """Série mensal serializada (leitura rápida)"""
+    receitas = view.filter_by_company(ReceitaMensal.objects.filter(ano=ano))
+    return ReceitaMensalValuesSerializer(
+        ReceitaMensalValuesSerializer.values(receitas.order_by('mes')), many=True
+    ).data
+
+
+def resumir_retrospectiva(ano, consolidados, receitas_mensais):
+    """Monta a retrospectiva a partir das duas consultas (sem queries)"""
+    # Totais
+    totais = {
+        'receita_total': sum(c.receita_total for c in consolidados),
+        'investimento_total': sum(c.investimento_total for c in consolidados),
+        'leads_total': sum(c.leads_total for c in consolidados),
+    }
+    
+    # ROAS global
+    roas_global = 0
+    if len(consolidados) == 1:
+        roas_global = consolidados[0].roas_global
+    elif totais['investimento_total'] > 0:
+        roas_global = float(totais['receita_total'] / totais['investimento_total'])
+    
+    # Mês de pico
+    mes_pico = max(
+        (c for c in consolidados if c.mes_pico),
+        key=lambda c: c.receita_pico,
+        default=None
+    )
+    mes_pico_data = None
+    if mes_pico:
+        mes_pico_data = {
+            'mes': mes_pico.mes_pico,
+            'mes_nome': mes_pico.get_mes_pico_display(),
+            'receita': float(mes_pico.receita_pico)
+        }
+    
+    return {
+        'ano': ano,
+        'receita_total': totais['receita_total'],
+        'investimento_total': totais['investimento_total'],
+        'roas_global': round(roas_global, 2),
+        'leads_total': totais['leads_total'],
+        'mes_pico': mes_pico_data,
+        'receitas_mensais': receitas_mensais
+    }
+
+
+def montar_retrospectiva(view, ano):
+    """Retrospectiva anual no escopo de empresa da view (2 queries)"""
+    return resumir_retrospectiva(
+        ano,
+        consolidados_retrospectiva(view, ano),
+        receitas_retrospectiva(view, ano)
+    )
 
 
-class VendedorViewSet(CompanyFilterMixin, viewsets.ModelViewSet):
+def comparativo_vendedores_qs(view, ano):
+    """Vendas do ano agrupadas por vendedor, maior total primeiro"""
+    vendas = view.filter_by_company(VendaVendedor.objects.filter(ano=ano))
+    
+    # Agrupa por vendedor
+    return vendas.values(
+        'vendedor__nome'
+    ).annotate(
+        total=Sum('valor')
+    ).order_by('-total')
+
+
+def item_comparativo(item):
+    return {'vendedor': item['vendedor__nome'], 'total': item['total']}
+
+
+def montar_comparativo_vendedores(view, ano):
+    """Ranking de vendas por vendedor no escopo de empresa da view (1 query)"""
+    return [item_comparativo(item) for item in comparativo_vendedores_qs(view, ano)]
+
+
+class VendedorViewSet(CompanyFilterMixin, ExportMixin, viewsets.ModelViewSet):
     """ViewSet para Vendedores"""
     queryset = Vendedor.objects.all()
     serializer_class = VendedorSerializer
     permission_classes = [CanEditOrReadOnly]
+    filter_backends = [DjangoFilterBackend, OrderingFilter]
     filterset_fields = ['is_active']
+    ordering_fields = ['nome', 'total_vendas']
+    # Querysets com GROUP BY não herdam o Meta.ordering
+    ordering = ['nome']
+    export_fields = ['id', 'company_id', 'nome', 'email', 'is_active', 'total_vendas', 'created_at']
+    
+    def get_queryset(self):
+        """Anota o total de vendas, opcionalmente restrito a ?ano= e ?mes="""
+        periodo = Q()
+        try:
+            ano = int(self.request.query_params.get('ano') or 0)
+            mes = int(self.request.query_params.get('mes') or 0)
+        except ValueError:
+            raise ValidationError({'detail': 'Parâmetros inválidos (ano, mes).'})
+        if ano:
+            periodo &= Q(vendas__ano=ano)
+        if mes:
+            periodo &= Q(vendas__mes=mes)
+        
+        return super().get_queryset().annotate(
+            total_vendas=Coalesce(
+                Sum('vendas__valor', filter=periodo),
+                Value(0),
+                output_field=DecimalField(max_digits=14, decimal_places=2)
+            )
+        )
 
 
-class ReceitaMensalViewSet(CompanyFilterMixin, viewsets.ModelViewSet):
+class ReceitaMensalViewSet(ValuesListMixin, CompanyFilterMixin, BulkUpsertMixin, ExportMixin, viewsets.ModelViewSet):
     """ViewSet para Receita Mensal"""
     queryset = ReceitaMensal.objects.all()
     serializer_class = ReceitaMensalSerializer
+    values_serializer_class = ReceitaMensalValuesSerializer
     permission_classes = [CanEditOrReadOnly]
+    renderer_classes = SERIE_RENDERER_CLASSES
     filterset_fields = ['ano', 'mes']
+    pagination_class = DashboardPagination
+    keyset_ordering = ['-ano', '-mes', '-id']
+    bulk_unique_fields = ['company', 'ano', 'mes']
+    bulk_update_fields = ['receita', 'investimento', 'leads', 'updated_at']
+    export_fields = ['id', 'company_id', 'ano', 'mes', 'receita', 'investimento', 'leads', 'created_at', 'updated_at']
     
     @action(detail=False, methods=['get'])
+    @tenant_cached
     def retrospectiva(self, request):
         """Retorna dados da retrospectiva anual"""
         ano = request.query_params.get('ano', 2025)
-        qs = self.get_queryset().filter(ano=ano)
-        
-        # Totais
-        totais = qs.aggregate(
-            receita_total=Coalesce(Sum('receita'), 0),
-            investimento_total=Coalesce(Sum('investimento'), 0),
-            leads_total=Coalesce(Sum('leads'), 0)
-        )
-        
-        # ROAS global
-        roas_global = 0
-        if totais['investimento_total'] > 0:
-            roas_global = float(totais['receita_total'] / totais['investimento_total'])
-        
-        # Mês de pico
-        mes_pico = qs.order_by('-receita').first()
-        mes_pico_data = None
-        if mes_pico:
-            mes_pico_data = {
-                'mes': mes_pico.mes,
-                'mes_nome': mes_pico.get_mes_display(),
-                'receita': float(mes_pico.receita)
-            }
-        
-        # Dados mensais
-        receitas_mensais = ReceitaMensalSerializer(qs.order_by('mes'), many=True).data
+        return Response(montar_retrospectiva(self, ano))
+    
+    @action(detail=False, methods=['get'])
+    @tenant_cached
+    def tendencia(self, request):
+        """Série mensal de vários anos com YoY, somas móveis e acumulado do ano"""
+        try:
+            ano_fim = int(request.query_params.get('ano_fim') or timezone.localdate().year)
+            ano_inicio = int(request.query_params.get('ano_inicio') or ano_fim - 4)
+        except ValueError:
+            raise ValidationError({'ano_inicio': 'Informe anos válidos.'})
+        if not 0 <= ano_fim - ano_inicio < TENDENCIA_MAX_ANOS:
+            raise ValidationError({
+                'ano_inicio': f'O intervalo deve ter de 1 a {TENDENCIA_MAX_ANOS} anos.'
+            })
         
         return Response({
-            'ano': ano,
-            'receita_total': totais['receita_total'],
-            'investimento_total': totais['investimento_total'],
-            'roas_global': round(roas_global, 2),
-            'leads_total': totais['leads_total'],
-            'mes_pico': mes_pico_data,
-            'receitas_mensais': receitas_mensais
+            'ano_inicio': ano_inicio,
+            'ano_fim': ano_fim,
+            'meses': self.get_queryset().tendencia(ano_inicio, ano_fim),
         })
     
     @action(detail=False, methods=['get'])
+    @tenant_cached
     def comparativo_vendedores(self, request):
         """Retorna comparativo de vendas por vendedor"""
         ano = request.query_params.get('ano', 2025)
-        user = request.user
-        
-        # Filtra por empresa
-        if user.is_platform_admin:
-            company_id = request.query_params.get('company')
-            vendas = VendaVendedor.objects.filter(ano=ano)
-            if company_id:
-                vendas = vendas.filter(company_id=company_id)
-        else:
-            vendas = VendaVendedor.objects.filter(
-                company=user.company,
-                ano=ano
-            )
-        
-        # Agrupa por vendedor
-        comparativo = vendas.values(
-            'vendedor__nome'
-        ).annotate(
-            total=Sum('valor')
-        ).order_by('-total')
-        
-        result = [
-            {'vendedor': item['vendedor__nome'], 'total': item['total']}
-            for item in comparativo
-        ]
-        
-        return Response(result)
+        return Response(montar_comparativo_vendedores(self, ano))
 
 
-class VendaVendedorViewSet(CompanyFilterMixin, viewsets.ModelViewSet):
+class VendaVendedorViewSet(ValuesListMixin, CompanyFilterMixin, BulkUpsertMixin, ExportMixin, viewsets.ModelViewSet):
     """ViewSet para Vendas por Vendedor"""
     queryset = VendaVendedor.objects.all()
     serializer_class = VendaVendedorSerializer
+    values_serializer_class = VendaVendedorValuesSerializer
     permission_classes = [CanEditOrReadOnly]
+    renderer_classes = SERIE_RENDERER_CLASSES
     filterset_fields = ['vendedor', 'ano', 'mes']
+    pagination_class = DashboardPagination
+    keyset_ordering = ['-ano', '-mes', '-id']
+    select_related_fields = ['vendedor']
+    only_fields = [
+        'id', 'company_id', 'vendedor_id', 'vendedor__nome',
+        'ano', 'mes', 'valor', 'created_at'
+    ]
+    bulk_serializer_class = VendaVendedorBulkSerializer
+    bulk_unique_fields = ['company', 'vendedor', 'ano', 'mes']
+    bulk_update_fields = ['valor', 'updated_at']
+    export_fields = [
+        'id', 'company_id', 'vendedor_id', 'vendedor__nome',
+        'ano', 'mes', 'valor', 'created_at', 'updated_at'
+    ]
+    
+    def get_bulk_serializer_context(self, company):
+        context = super().get_bulk_serializer_context(company)
+        context['vendedores'] = {v.pk: v for v in Vendedor.objects.filter(company=company)}
+        return context
 
 
-class EstrategiaViewSet(CompanyFilterMixin, viewsets.ModelViewSet):
+class EstrategiaViewSet(CompanyFilterMixin, ExportMixin, viewsets.ModelViewSet):
     """ViewSet para Estratégia"""
     queryset = Estrategia.objects.all()
     permission_classes = [CanEditOrReadOnly]
+    renderer_classes = SERIE_RENDERER_CLASSES
     filterset_fields = ['ano', 'cenario']
+    export_fields = [
+        'id', 'company_id', 'ano', 'cenario', 'orcamento_total',
+        'receita_projetada', 'roas_minimo', 'created_at', 'updated_at'
+    ]
+    
+    def get_queryset(self):
+        return super().get_queryset().prefetch_related('investimentos_mensais')
     
     def get_serializer_class(self):
         if self.action == 'create':
             return EstrategiaCreateSerializer
         return EstrategiaSerializer
     
+    @tenant_cached
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+    
+    @action(detail=False, methods=['get'])
+    @tenant_cached
+    def simulacao(self, request):
+        """Monte Carlo dos cenários do ano sobre o histórico de ROAS da empresa"""
+        company_id = self.get_company_id()
+        if not company_id:
+            raise ValidationError({'company': 'Informe a empresa (?company=).'})
+        
+        try:
+            ano = int(request.query_params.get('ano') or timezone.localdate().year)
+            caminhos = int(request.query_params.get('caminhos') or SIMULACAO_CAMINHOS)
+            seed = request.query_params.get('seed')
+            seed = int(seed) if seed else None
+        except ValueError:
+            raise ValidationError({'detail': 'Parâmetros inválidos (ano, caminhos, seed).'})
+        if not 100 <= caminhos <= SIMULACAO_MAX_CAMINHOS:
+            raise ValidationError({
+                'caminhos': f'Informe entre 100 e {SIMULACAO_MAX_CAMINHOS} caminhos.'
+            })
+        
+        estrategias = list(self.get_queryset().filter(ano=ano).order_by('cenario'))
+        if not estrategias:
+            raise ValidationError({'ano': 'Nenhuma estratégia cadastrada para o ano.'})
+        
+        roas = roas_historico(company_id)
+        if len(roas) < MIN_HISTORICO:
+            raise ValidationError({
+                'detail': f'São necessários ao menos {MIN_HISTORICO} meses de receita com investimento.'
+            })
+        
+        return Response(resumo_simulacao(estrategias, roas, ano, caminhos, seed))
+    
     @action(detail=True, methods=['post'])
     def set_investimentos(self, request, pk=None):
         """Define investimentos mensais da estratégia"""
         estrategia = self.get_object()
-        investimentos = request.data.get('investimentos', [])
-        
-        # Remove investimentos antigos
-        estrategia.investimentos_mensais.all().delete()
+        serializer = PlanoMensalSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
         
-        # Cria novos
-        for inv in investimentos:
-            InvestimentoMensal.objects.create(
-                estrategia=estrategia,
-                mes=inv['mes'],
-                valor=inv['valor']
-            )
+        # Grava só a diferença, em uma transação
+        InvestimentoMensal.objects.sincronizar(
+            estrategia, serializer.validated_data['investimentos']
+        )
         
-        serializer = EstrategiaSerializer(estrategia)
-        return Response(serializer.data)
+        estrategia = self.get_queryset().get(pk=estrategia.pk)
+        return Response(EstrategiaSerializer(estrategia).data)
 
 
-class GestaoSemanalViewSet(CompanyFilterMixin, viewsets.ModelViewSet):
+class GestaoSemanalViewSet(ValuesListMixin, CompanyFilterMixin, BulkUpsertMixin, ExportMixin, viewsets.ModelViewSet):
     """ViewSet para Gestão Semanal"""
     queryset = GestaoSemanal.objects.all()
     serializer_class = GestaoSemanalSerializer
+    values_serializer_class = GestaoSemanalValuesSerializer
     permission_classes = [CanEditOrReadOnly]
+    renderer_classes = SERIE_RENDERER_CLASSES
     filterset_fields = ['ano', 'mes', 'semana']
+    pagination_class = DashboardPagination
+    keyset_ordering = ['-ano', '-mes', '-semana', '-id']
+    bulk_unique_fields = ['company', 'ano', 'mes', 'semana']
+    bulk_update_fields = ['investimento', 'leads', 'vendas', 'updated_at']
+    export_fields = [
+        'id', 'company_id', 'ano', 'mes', 'semana', 'investimento',
+        'leads', 'vendas', 'created_at', 'updated_at'
+    ]
+    
+    @action(detail=False, methods=['get'])
+    @tenant_cached
+    def reconciliacao(self, request):
+        """Soma semanal de cada mês comparada à Receita Mensal"""
+        filtros = {}
+        try:
+            for campo in ('ano', 'mes'):
+                if request.query_params.get(campo):
+                    filtros[campo] = int(request.query_params[campo])
+            tolerancia = Decimal(
+                request.query_params.get('tolerancia') or RECONCILIACAO_TOLERANCIA
+            )
+        except (ValueError, InvalidOperation):
+            raise ValidationError({'detail': 'Parâmetros inválidos (ano, mes, tolerancia).'})
+        
+        meses = self.get_queryset().filter(**filtros).reconciliar(
+            self.filter_by_company(ReceitaMensal.objects.filter(**filtros)),
+            tolerancia
+        )
+        resumo = resumir_reconciliacao(meses)
+        if request.query_params.get('apenas_divergentes') in ('1', 'true'):
+            meses = [item for item in meses if item['status'] != 'ok']
+        
+        return Response({
+            'tolerancia': tolerancia,
+            'resumo': resumo,
+            'meses': meses,
+        })
 
 
-class ProtocoloViewSet(CompanyFilterMixin, viewsets.ModelViewSet):
+class ProtocoloViewSet(ValuesListMixin, CompanyFilterMixin, ExportMixin, viewsets.ModelViewSet):
     """ViewSet para Protocolos"""
     queryset = Protocolo.objects.all()
     serializer_class = ProtocoloSerializer
+    values_serializer_class = ProtocoloValuesSerializer
     permission_classes = [CanEditOrReadOnly]
     filterset_fields = ['tipo']
+    export_fields = ['id', 'company_id', 'tipo', 'titulo', 'descricao', 'icone', 'cor', 'ordem']
+    
+    @tenant_cached
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+
+class AlertaRoasViewSet(CompanyFilterMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Alertas de ROAS gravados pelo comando avaliar_alertas_roas. Sem cache por
+    versão: a avaliação não altera a versão dos dados da empresa.
+    """
+    queryset = AlertaRoas.objects.all()
+    serializer_class = AlertaRoasSerializer
+    permission_classes = [CanEditOrReadOnly]
+    filterset_fields = ['ano', 'mes', 'periodo', 'estrategia']
+    select_related_fields = ['estrategia']
+
+
+class TarefaViewSet(CompanyFilterMixin, mixins.CreateModelMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Tarefas em segundo plano. POST enfileira (202) e devolve a tarefa; se já
+    existe uma ativa com a mesma chave, ela é devolvida (200). O status é
+    acompanhado em GET /api/tarefas/{id}/.
+    """
+    queryset = Tarefa.objects.all()
+    serializer_class = TarefaSerializer
+    permission_classes = [CanEditOrReadOnly]
+    filterset_fields = ['tipo', 'status']
+    
+    def create(self, request, *args, **kwargs):
+        serializer = TarefaCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        company = self.get_write_company()
+        
+        tarefa, criada = enfileirar(
+            serializer.validated_data['tipo'],
+            company_id=company.pk if company else None,
+            parametros=serializer.validated_data['parametros'],
+            criado_por_id=request.user.pk
+        )
+        return Response(
+            TarefaSerializer(tarefa).data,
+            status=status.HTTP_202_ACCEPTED if criada else status.HTTP_200_OK
+        )
+
+
+class DashboardViewSet(CompanyFilterMixin, viewsets.ViewSet):
+    """Endpoints que agregam vários blocos do dashboard em uma resposta"""
+    
+    @action(detail=False, methods=['get'])
+    @tenant_cached
+    def bundle(self, request):
+        """
+        Retrospectiva, ranking de vendedores, estratégia ativa com
+        investimentos, gestão semanal do mês e protocolos em uma única
+        requisição, com número fixo de queries (independe do volume de dados).
+        """
+        hoje = timezone.localdate()
+        try:
+            ano = int(request.query_params.get('ano') or hoje.year)
+            mes = int(request.query_params.get('mes') or hoje.month)
+        except ValueError:
+            raise ValidationError({'detail': 'Parâmetros inválidos (ano, mes).'})
+        if not 1 <= mes <= 12:
+            raise ValidationError({'mes': 'Mês deve estar entre 1 e 12.'})
+        cenario = request.query_params.get('cenario', Estrategia.Cenario.CONSERVADOR)
+        
+        estrategia = self.filter_by_company(
+            Estrategia.objects.filter(ano=ano, cenario=cenario)
+        ).prefetch_related('investimentos_mensais').order_by('created_at').first()
+        
+        gestao = self.filter_by_company(
+            GestaoSemanal.objects.filter(ano=ano, mes=mes)
+        ).order_by('semana')
+        
+        protocolos = self.filter_by_company(Protocolo.objects.all())
+        
+        return Response({
+            'ano': ano,
+            'mes': mes,
+            'retrospectiva': montar_retrospectiva(self, ano),
+            'comparativo_vendedores': montar_comparativo_vendedores(self, ano),
+            'estrategia': EstrategiaSerializer(estrategia).data if estrategia else None,
+            'gestao_semanal': GestaoSemanalSerializer(gestao, many=True).data,
+            'protocolos': ProtocoloSerializer(protocolos, many=True).data,
+        })
@@ -0,0 +1,7 @@
+import os
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'v4vision.settings')
+# Sob ASGI as leituras do dashboard usam as views assíncronas
+os.environ.setdefault('DASHBOARD_ASYNC_VIEWS', 'True')
+application = get_asgi_application()
@@ -27,6 +27,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.RequestMetricsMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -57,18 +59,79 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'v4vision.wsgi.application'
+ASGI_APPLICATION = 'v4vision.asgi.application'
 
 # Database
+# Com DB_POOL, o backend core.db mantém um pool de conexões por processo
+# (core/db/pool.py): o Django "fecha" a conexão no fim de cada requisição e
+# ela volta para o pool. Sem pool, DB_CONN_MAX_AGE mantém uma conexão
+# persistente por thread.
+DB_POOL = config('DB_POOL', default=True, cast=bool)
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'core.db' if DB_POOL else 'django.db.backends.postgresql',
         'NAME': config('DB_NAME', default='v4vision'),
         'USER': config('DB_USER', default='postgres'),
         'PASSWORD': config('DB_PASSWORD', default='postgres'),
         'HOST': config('DB_HOST', default='db'),
         'PORT': config('DB_PORT', default='5432'),
+        'CONN_MAX_AGE': 0 if DB_POOL else config('DB_CONN_MAX_AGE', default=0, cast=int),
+        'CONN_HEALTH_CHECKS': True,
+        'POOL': {
+            'MAX_SIZE': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+            'TIMEOUT': config('DB_POOL_TIMEOUT', default=10.0, cast=float),
+            'MAX_IDLE': config('DB_POOL_MAX_IDLE', default=300.0, cast=float),
+            'MAX_LIFETIME': config('DB_POOL_MAX_LIFETIME', default=3600.0, cast=float),
+            'CHECK': config('DB_POOL_CHECK', default=True, cast=bool),
+        },
+    }
+}
+
+# Réplicas de leitura: DB_REPLICA_HOSTS=host[:porta],... cria os aliases
+# replica_1, replica_2... com o mesmo banco, usuário e senha do primário.
+# GETs da API autenticados por token leem de uma réplica (core/db/router.py);
+# depois de uma escrita o usuário lê do primário por DB_STICKY_PRIMARY_SECONDS.
+# Sem réplicas tudo vai para o primário. Para testar localmente aponte uma
+# réplica para o próprio primário (ex.: DB_REPLICA_HOSTS=db).
+for indice, replica in enumerate(filter(None, config('DB_REPLICA_HOSTS', default='').split(',')), 1):
+    host, _, port = replica.strip().partition(':')
+    DATABASES[f'replica_{indice}'] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
     }
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias.startswith('replica_')]
+DATABASE_ROUTERS = ['core.db.router.ReplicaRouter']
+DB_STICKY_PRIMARY_SECONDS = config('DB_STICKY_PRIMARY_SECONDS', default=10, cast=int)
+
+# Cache
+# O alias "dashboard" guarda as respostas versionadas por empresa
+# (dashboard/cache.py). MAX_ENTRIES limita o tamanho nos backends locais.
+# O "default" guarda a lista de bloqueio de tokens JWT (core/authentication.py):
+# com JWT_STATELESS_AUTH ele precisa ser compartilhado (Redis, Memcached, banco).
+DASHBOARD_CACHE_ALIAS = 'dashboard'
+DASHBOARD_CACHE_BACKEND = config(
+    'DASHBOARD_CACHE_BACKEND',
+    default='django.core.cache.backends.locmem.LocMemCache'
+)
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default=''),
+    },
+    DASHBOARD_CACHE_ALIAS: {
+        'BACKEND': DASHBOARD_CACHE_BACKEND,
+        'LOCATION': config('DASHBOARD_CACHE_LOCATION', default='v4vision-dashboard'),
+        'TIMEOUT': config('DASHBOARD_CACHE_TTL', default=300, cast=int),
+        'KEY_PREFIX': 'v4vision',
+    },
 }
+if DASHBOARD_CACHE_BACKEND.split('.')[-1] in ('LocMemCache', 'FileBasedCache', 'DatabaseCache'):
+    CACHES[DASHBOARD_CACHE_ALIAS]['OPTIONS'] = {
+        'MAX_ENTRIES': config('DASHBOARD_CACHE_MAX_ENTRIES', default=1000, cast=int),
+    }
 
 # Custom User Model
 AUTH_USER_MODEL = 'core.User'
@@ -101,7 +164,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'core.authentication.TenantJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -111,15 +174,57 @@ REST_FRAMEWORK = {
     ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
+    # Mesma saída do JSONRenderer, serializada com orjson (core/renderers.py)
+    'DEFAULT_RENDERER_CLASSES': (
+        'core.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
 }
 
+# Autoriza pelas claims do token (company_id, role, can_edit) sem buscar o
+# usuário no banco; revogações ficam no cache JWT_DENY_LIST_CACHE_ALIAS, que
+# precisa ser compartilhado entre os processos (checagem core.E001). Com o modo
+# ligado o token de acesso dura poucos minutos e o refresh relê o usuário.
+JWT_STATELESS_AUTH = config('JWT_STATELESS_AUTH', default=False, cast=bool)
+JWT_DENY_LIST_CACHE_ALIAS = 'default'
+
 # JWT Settings
 SIMPLE_JWT = {
-    'ACCESS_TOKEN_LIFETIME': timedelta(hours=12),
+    'ACCESS_TOKEN_LIFETIME': (
+        timedelta(minutes=config('JWT_STATELESS_ACCESS_MINUTES', default=15, cast=int))
+        if JWT_STATELESS_AUTH else timedelta(hours=12)
+    ),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
     'AUTH_HEADER_TYPES': ('Bearer',),
+    'TOKEN_OBTAIN_SERIALIZER': 'core.serializers.TenantTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'core.serializers.TenantTokenRefreshSerializer',
+}
+
+
+# Leituras do dashboard pelas views assíncronas (dashboard/async_views.py).
+# Ligado por padrão quando servido por v4vision.asgi
+DASHBOARD_ASYNC_VIEWS = config('DASHBOARD_ASYNC_VIEWS', default=False, cast=bool)
+
+# Instrumentação por requisição (core/middleware.py)
+REQUEST_METRICS_ENABLED = config('REQUEST_METRICS_ENABLED', default=True, cast=bool)
+SLOW_QUERY_MS = config('SLOW_QUERY_MS', default=200, cast=int)
+DUPLICATE_QUERY_THRESHOLD = config('DUPLICATE_QUERY_THRESHOLD', default=5, cast=int)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'v4vision': {
+            'handlers': ['console'],
+            'level': config('V4VISION_LOG_LEVEL', default='INFO'),
+            'propagate': False,
+        },
+    },
 }
 
 # CORS
@@ -128,3 +233,4 @@ CORS_ALLOWED_ORIGINS = config(
     default='http://localhost:3000,http://localhost:5173'
 ).split(',')
 CORS_ALLOW_CREDENTIALS = True
+CORS_EXPOSE_HEADERS = ['ETag', 'Server-Timing']
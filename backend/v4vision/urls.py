@@ -8,10 +8,12 @@ from rest_framework_simplejwt.views import (
     TokenRefreshView,
 )
 
-from core.views import CompanyViewSet, UserViewSet, RegisterView, LogoutView
+from core.views import CompanyViewSet, UserViewSet, RegisterView, LogoutView, MetricsView
+from dashboard.async_views import async_urlpatterns
 from dashboard.views import (
     VendedorViewSet, ReceitaMensalViewSet, VendaVendedorViewSet,
-    EstrategiaViewSet, GestaoSemanalViewSet, ProtocoloViewSet
+    EstrategiaViewSet, GestaoSemanalViewSet, ProtocoloViewSet, AlertaRoasViewSet,
+    TarefaViewSet, DashboardViewSet
 )
 
 # Router da API
@@ -28,18 +30,29 @@ router.register(r'vendas-vendedor', VendaVendedorViewSet, basename='venda-vended
 router.register(r'estrategias', EstrategiaViewSet, basename='estrategia')
 router.register(r'gestao-semanal', GestaoSemanalViewSet, basename='gestao-semanal')
 router.register(r'protocolos', ProtocoloViewSet, basename='protocolo')
+router.register(r'alertas-roas', AlertaRoasViewSet, basename='alerta-roas')
+router.register(r'tarefas', TarefaViewSet, basename='tarefa')
+router.register(r'dashboard', DashboardViewSet, basename='dashboard')
+
+api_urls = router.urls
+if settings.DASHBOARD_ASYNC_VIEWS:
+    # GET das leituras do dashboard pelas views assíncronas (mesmos caminhos)
+    api_urls = async_urlpatterns(router) + api_urls
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     
     # API
-    path('api/', include(router.urls)),
+    path('api/', include(api_urls)),
     
     # Auth
     path('api/auth/login/', TokenObtainPairView.as_view(), name='token_obtain'),
     path('api/auth/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('api/auth/logout/', LogoutView.as_view(), name='logout'),
     path('api/auth/register/', RegisterView.as_view(), name='register'),
+    
+    # Métricas do processo (pool de conexões)
+    path('api/metrics/', MetricsView.as_view(), name='metrics'),
 ]
 
 # Serve media files in development
@@ -19,12 +19,9 @@ export default function Retrospectiva() {
 
   const loadData = async () => {
     try {
-      const [retroResponse, compResponse] = await Promise.all([
-        dashboardService.getRetrospectiva(2025),
-        dashboardService.getComparativoVendedores(2025)
-      ])
-      setData(retroResponse.data)
-      setComparativo(compResponse.data)
+      const response = await dashboardService.getBundle({ ano: 2025 })
+      setData(response.data.retrospectiva)
+      setComparativo(response.data.comparativo_vendedores)
     } catch (error) {
       console.error('Erro ao carregar dados:', error)
     } finally {
@@ -57,9 +57,13 @@ export const userService = {
 }
 
 export const dashboardService = {
+  // Bundle (retrospectiva, vendedores, estratégia, gestão do mês e protocolos)
+  getBundle: (params) => api.get('/api/dashboard/bundle/', { params }),
+  
   // Retrospectiva
   getRetrospectiva: (ano) => api.get(`/api/receitas/retrospectiva/?ano=${ano}`),
   getComparativoVendedores: (ano) => api.get(`/api/receitas/comparativo_vendedores/?ano=${ano}`),
+  getTendencia: (anoInicio, anoFim) => api.get('/api/receitas/tendencia/', { params: { ano_inicio: anoInicio, ano_fim: anoFim } }),
   
   // Receitas
   getReceitas: (params) => api.get('/api/receitas/', { params }),
@@ -72,11 +76,18 @@ export const dashboardService = {
   createEstrategia: (data) => api.post('/api/estrategias/', data),
   updateEstrategia: (id, data) => api.patch(`/api/estrategias/${id}/`, data),
   setInvestimentos: (id, data) => api.post(`/api/estrategias/${id}/set_investimentos/`, data),
+  getSimulacao: (ano, params) => api.get('/api/estrategias/simulacao/', { params: { ano, ...params } }),
   
   // Gestão Semanal
   getGestaoSemanal: (params) => api.get('/api/gestao-semanal/', { params }),
   createGestaoSemanal: (data) => api.post('/api/gestao-semanal/', data),
   updateGestaoSemanal: (id, data) => api.patch(`/api/gestao-semanal/${id}/`, data),
+  getReconciliacao: (params) => api.get('/api/gestao-semanal/reconciliacao/', { params }),
+  getAlertasRoas: (params) => api.get('/api/alertas-roas/', { params }),
+  
+  // Tarefas em segundo plano
+  createTarefa: (tipo, parametros) => api.post('/api/tarefas/', { tipo, parametros }),
+  getTarefa: (id) => api.get(`/api/tarefas/${id}/`),
   
   // Protocolos
   getProtocolos: () => api.get('/api/protocolos/'),